@@ -7,9 +7,11 @@
 
 Доступные команды:
 - run: Запуск API сервера
+- worker: Запуск воркера фоновых задач скрапинга
 - scrape_all: Сбор данных для всех категорий
 - scrape <категория>: Сбор данных для определенной категории
 - clear_cache: Очистка кэша
+- init_search_schema: Создание столбца и индексов полнотекстового поиска в БД
 - create_superuser: Создание администратора
 """
 
@@ -48,35 +50,56 @@ def run_server(args):
     
     host = args.host or "0.0.0.0"
     port = args.port or 8000
+    # Каждый процесс при старте заново обходит категории Wiki (startup_event),
+    # поэтому по умолчанию один процесс; режим перезагрузки работает только с ним
+    workers = 1 if args.reload else (args.workers or 1)
     
-    logger.info(f"Запуск сервера на {host}:{port}")
+    logger.info(f"Запуск сервера на {host}:{port} ({workers} процессов)")
     uvicorn.run(
         "src.main:app",
         host=host,
         port=port,
-        reload=args.reload
+        reload=args.reload,
+        workers=workers,
+        # uvloop/httptools, если установлены (uvicorn[standard]), иначе asyncio/h11
+        loop="auto",
+        http="auto",
+        limit_concurrency=1000,
+        timeout_keep_alive=30,
+        access_log=False
     )
 
+def run_worker(args):
+    """Запуск воркера фоновых задач скрапинга"""
+    from arq import run_worker as run_arq_worker
+    from src.app.worker.scrape_worker import WorkerSettings
+    from src.core.config import ensure_runtime_dirs
+    
+    ensure_runtime_dirs()
+    logger.info("Запуск воркера скрапинга")
+    run_arq_worker(WorkerSettings)
+
 def scrape_data(args):
-    """Сбор данных из Wiki"""
-    from src.app.scraper.wiki_scraper import scrape_category, get_all_wiki_categories, initialize_wiki, CATEGORIES
+    """Сбор данных из Wiki с сохранением в кэш и на диск"""
+    from src.app.scraper.wiki_scraper import initialize_wiki, CATEGORIES
+    from src.app.worker.scrape_worker import scrape_and_store_category
+    from src.core.config import ensure_runtime_dirs
     
+    ensure_runtime_dirs()
     initialize_wiki()
     
     if args.category == "all":
         logger.info("Сбор данных для всех категорий")
         for cat_key, cat_name in CATEGORIES.items():
             logger.info(f"Обработка категории: {cat_key}")
-            result = scrape_category(cat_key)
-            logger.info(f"Собрано {len(result)} элементов для категории {cat_key}")
+            scrape_and_store_category(cat_key)
     else:
         if args.category not in CATEGORIES:
             logger.error(f"Категория '{args.category}' не найдена. Доступные категории: {', '.join(CATEGORIES.keys())}")
             return
         
         logger.info(f"Сбор данных для категории: {args.category}")
-        result = scrape_category(args.category)
-        logger.info(f"Собрано {len(result)} элементов для категории {args.category}")
+        scrape_and_store_category(args.category)
 
 def clear_cache(args):
     """Очистка кэша Redis"""
@@ -95,6 +118,22 @@ def clear_cache(args):
     
     logger.info("Кэш успешно очищен")
 
+def init_search_schema(args):
+    """Создание столбца search_vector и GIN-индексов для поискового движка"""
+    import asyncio
+    from src.app.search.search_engine import SearchEngine
+    from src.core.database import get_engine
+    
+    async def _init():
+        try:
+            await SearchEngine().ensure_search_schema()
+        finally:
+            await get_engine().dispose()
+    
+    logger.info("Создание схемы полнотекстового поиска")
+    asyncio.run(_init())
+    logger.info("Схема полнотекстового поиска готова")
+
 def create_superuser(args):
     """Создание пользователя-администратора"""
     # Здесь будет код для создания администратора, когда будет добавлена 
@@ -111,6 +150,10 @@ def main():
     run_parser.add_argument("--host", help="Хост для запуска (по умолчанию 0.0.0.0)")
     run_parser.add_argument("--port", type=int, help="Порт для запуска (по умолчанию 8000)")
     run_parser.add_argument("--reload", action="store_true", help="Автоматическая перезагрузка при изменении файлов")
+    run_parser.add_argument("--workers", type=int, help="Количество процессов (по умолчанию 1)")
+    
+    # Команда запуска воркера
+    subparsers.add_parser("worker", help="Запуск воркера фоновых задач скрапинга")
     
     # Команда сбора данных
     scrape_parser = subparsers.add_parser("scrape", help="Сбор данных из Wiki")
@@ -120,6 +163,9 @@ def main():
     cache_parser = subparsers.add_parser("clear_cache", help="Очистка кэша")
     cache_parser.add_argument("--category", help="Категория для очистки кэша (по умолчанию все)")
     
+    # Команда создания схемы поиска в БД
+    subparsers.add_parser("init_search_schema", help="Создание столбца и индексов полнотекстового поиска")
+    
     # Команда создания администратора
     admin_parser = subparsers.add_parser("create_superuser", help="Создание администратора")
     
@@ -127,10 +173,14 @@ def main():
     
     if args.command == "run":
         run_server(args)
+    elif args.command == "worker":
+        run_worker(args)
     elif args.command == "scrape":
         scrape_data(args)
     elif args.command == "clear_cache":
         clear_cache(args)
+    elif args.command == "init_search_schema":
+        init_search_schema(args)
     elif args.command == "create_superuser":
         create_superuser(args)
     else:
@@ -11,10 +11,12 @@ API роутеры для Cyberpunk 2077 Wiki
 
 import os
 import json
+import orjson
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import Response
 from typing import List, Dict, Any, Optional
 
-from src.app.redis.redis_cache import redis_cache
+from src.app.redis.redis_cache import get_redis_async
 from src.core.config import settings
 from src.api.v1 import characters, vehicles, locations, items, search, weapons, perks
 
@@ -67,31 +69,36 @@ api_router.include_router(
     tags=["search"],
 )
 
+# Ответ корневого эндпоинта не меняется, поэтому сериализуем его один раз
+API_ROOT_RESPONSE = orjson.dumps({
+    "api": "Cyberpunk 2077 Wiki API",
+    "version": API_VERSION,
+    "docs_url": "/docs" if settings.DEBUG_MODE else None,
+    "endpoints": [
+        f"/api/{API_VERSION}/characters",
+        f"/api/{API_VERSION}/vehicles",
+        f"/api/{API_VERSION}/locations",
+        f"/api/{API_VERSION}/weapons",
+        f"/api/{API_VERSION}/perks",
+        f"/api/{API_VERSION}/items",
+        f"/api/{API_VERSION}/search",
+    ]
+})
+
 # Корневой эндпоинт API
 @api_router.get("/")
 async def api_root():
     """Корневой эндпоинт API"""
-    return {
-        "api": "Cyberpunk 2077 Wiki API",
-        "version": API_VERSION,
-        "docs_url": "/docs",
-        "endpoints": [
-            f"/api/{API_VERSION}/characters",
-            f"/api/{API_VERSION}/vehicles",
-            f"/api/{API_VERSION}/locations",
-            f"/api/{API_VERSION}/weapons",
-            f"/api/{API_VERSION}/perks",
-            f"/api/{API_VERSION}/items",
-            f"/api/{API_VERSION}/search",
-        ]
-    }
+    return Response(content=API_ROOT_RESPONSE, media_type="application/json")
 
 # Список всех категорий
 @api_router.get("/categories")
-async def list_categories():
+async def list_categories(
+    redis: Any = Depends(get_redis_async)
+):
     """Получение списка всех категорий"""
     # Сначала проверяем кэш
-    cached_categories = redis_cache.get_all_categories()
+    cached_categories = await redis.get_all_categories()
     if cached_categories:
         return {
             "source": "cache",
@@ -106,10 +113,12 @@ async def list_categories():
 
 # Эндпоинт для проверки статуса API
 @api_router.get("/status")
-async def api_status():
+async def api_status(
+    redis: Any = Depends(get_redis_async)
+):
     """Проверка статуса API"""
     # Проверка подключения к кэшу
-    cache_status = redis_cache.ping()
+    cache_status = await redis.ping()
     
     return {
         "status": "operational",
@@ -3,17 +3,23 @@
 """
 
 import os
-import json
+import time
 import logging
 import asyncio
-from typing import List, Dict, Any, Optional, Union
+import orjson
+from typing import AsyncIterator, List, Dict, Any, Optional, Union
 from datetime import datetime, timedelta
 
 from fastapi import APIRouter, HTTPException, Query, Path, BackgroundTasks, Depends
-from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
+from pydantic import TypeAdapter
 
-from src.app.scraper.wiki_scraper import scrape_category, get_all_wiki_categories, initialize_wiki, CATEGORIES, get_page_metadata
-from src.app.redis.redis_cache import redis_cache, get_redis_sync, get_redis_async
+from src.app.scraper.wiki_scraper import get_all_wiki_categories, initialize_wiki, CATEGORIES, get_page_metadata
+from src.app.redis.redis_cache import redis_cache, get_redis_async
+from src.app.worker.scrape_worker import (
+    task_queue, scrape_and_store_category, scrape_and_store_categories, build_search_corpus, UNSAFE_FILENAME_RE
+)
 from src.api.schemas import CategoryList, WikiItem, SearchResult, CategoryResult, APIStatus
 from src.core.config import settings
 
@@ -21,11 +27,42 @@ from src.core.config import settings
 API_VERSION = settings.API_V1_STR.strip("/")
 DATA_DIR = settings.TEMP_DIR
 DEBUG_MODE = settings.DEBUG_MODE
+# Категории не меняются во время работы, поэтому готовим их представления один раз
+CATEGORY_KEYS = frozenset(CATEGORIES)
+CATEGORY_ITEMS = tuple(CATEGORIES.items())
+# Валидатор и сериализатор WikiItem строится один раз при загрузке модуля
+WIKI_ITEM_ADAPTER = TypeAdapter(WikiItem)
+
+class ResponseMemo:
+    """Кэш ответа эндпоинта в памяти процесса на несколько секунд"""
+    
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self.time = 0.0
+        self.value = None
+        self.lock = asyncio.Lock()
+    
+    def get(self) -> Any:
+        """Сохраненный ответ или None, если он устарел"""
+        if self.value is not None and time.monotonic() - self.time < self.ttl:
+            return self.value
+        return None
+    
+    def set(self, value: Any) -> Any:
+        """Сохранение ответа"""
+        self.time = time.monotonic()
+        self.value = value
+        return value
+
+# /status и /categories опрашиваются часто, а меняются редко
+STATUS_MEMO = ResponseMemo(ttl=2)
+CATEGORIES_MEMO = ResponseMemo(ttl=5)
 
 # Создаем API Router
 router = APIRouter(
     prefix="/wiki",
     tags=["Wiki"],
+    default_response_class=ORJSONResponse,
     responses={404: {"description": "Элемент не найден"}},
 )
 
@@ -49,24 +86,35 @@ async def root():
     }
 
 @router.get("/status", response_model=APIStatus, tags=["System"])
-async def get_api_status():
+async def get_api_status(
+    redis: Any = Depends(get_redis_async)
+):
     """Получить статус API и подключенных сервисов"""
-    # Проверяем Wiki Scraper
+    # Одновременные запросы ждут одно вычисление, а не повторяют проверки
+    async with STATUS_MEMO.lock:
+        status = STATUS_MEMO.get()
+        if status is None:
+            status = STATUS_MEMO.set(await collect_api_status(redis))
+        return status
+
+async def collect_api_status(redis: Any) -> APIStatus:
+    """Проверка Wiki Scraper, Redis и кэшированных категорий"""
+    # Проверяем Wiki Scraper (сетевой запрос выполняем вне цикла событий).
+    # Запрос в initialize_wiki ограничен таймаутом, поэтому медленный API Wiki
+    # не держит блокировку STATUS_MEMO для остальных запросов дольше него
     wiki_ready = True
     try:
-        initialize_wiki()
+        await run_in_threadpool(initialize_wiki)
     except:
         wiki_ready = False
     
     # Проверяем Redis
-    redis_ready = redis_cache.ping()
+    redis_ready = await redis.ping()
     
     # Получаем список кэшированных категорий
     cached = []
     try:
-        for cat_key, cat_name in CATEGORIES.items():
-            if redis_cache.get_category_data(cat_key):
-                cached.append(cat_key)
+        cached = await redis.which_categories_cached(list(CATEGORIES))
     except:
         pass
     
@@ -78,78 +126,70 @@ async def get_api_status():
         cached_categories=cached
     )
 
+def save_item_files(item_title: str, item_data: Dict[str, Any]) -> None:
+    """Сохранение элемента в файл для каждой возможной категории"""
+    # Используем безопасное имя файла
+    safe_title = UNSAFE_FILENAME_RE.sub("_", item_title)
+    payload = orjson.dumps(item_data, option=orjson.OPT_INDENT_2)
+    for category in CATEGORIES:
+        category_dir = os.path.join(DATA_DIR, category)
+        os.makedirs(category_dir, exist_ok=True)
+        
+        item_path = os.path.join(category_dir, f"{safe_title}.json")
+        with open(item_path, 'wb') as f:
+            f.write(payload)
+
 async def scrape_category_async(category_name: str, background_tasks: BackgroundTasks):
     """Асинхронно запускает скрапинг категории и сохраняет в Redis"""
-    def _scrape():
-        try:
-            # Запускаем скрапинг
-            result = scrape_category(category_name)
-            
-            # Сохраняем в Redis
-            if result:
-                redis_cache.set_category_data(category_name, result)
-                
-                # Сохраняем каждый элемент отдельно для быстрого доступа
-                for title, item_data in result.items():
-                    redis_cache.set_item_data(title, item_data)
-                
-                logger.info(f"Категория {category_name} успешно загружена в кэш ({len(result)} элементов)")
-            else:
-                logger.warning(f"Скрапинг категории {category_name} не вернул данных")
-                
-            # Также сохраняем на диск как резервную копию
-            try:
-                category_dir = os.path.join(DATA_DIR, category_name)
-                os.makedirs(category_dir, exist_ok=True)
-                
-                # Сохраняем полный файл категории
-                filepath = os.path.join(DATA_DIR, f"{category_name}.json")
-                with open(filepath, 'w', encoding='utf-8') as f:
-                    json.dump(result, f, ensure_ascii=False, indent=2)
-                
-                # Сохраняем каждый элемент в отдельный файл
-                for title, item_data in result.items():
-                    # Используем безопасное имя файла
-                    safe_title = "".join(c if c.isalnum() else "_" for c in title)
-                    item_path = os.path.join(category_dir, f"{safe_title}.json")
-                    with open(item_path, 'w', encoding='utf-8') as f:
-                        json.dump(item_data, f, ensure_ascii=False, indent=2)
-                
-                logger.info(f"Категория {category_name} сохранена на диск")
-            except Exception as e:
-                logger.error(f"Ошибка сохранения категории {category_name} на диск: {str(e)}")
-                
-        except Exception as e:
-            logger.error(f"Ошибка скрапинга категории {category_name}: {str(e)}")
+    # Отправляем скрапинг в отдельный процесс воркера, чтобы не занимать потоки API
+    if await task_queue.enqueue_scrape(category_name):
+        return {"status": "Скрапинг поставлен в очередь"}
+    
+    # Очередь недоступна (например, без Redis) - выполняем в фоновом потоке
+    background_tasks.add_task(scrape_and_store_category, category_name)
+    return {"status": "Скрапинг запущен в фоновом режиме"}
+
+async def scrape_categories_async(category_names: List[str], background_tasks: BackgroundTasks):
+    """Асинхронно запускает скрапинг нескольких категорий"""
+    if await task_queue.enqueue_scrape_many(category_names):
+        return {"status": "Скрапинг поставлен в очередь"}
     
-    # Добавляем задачу в фоновый поток
-    background_tasks.add_task(_scrape)
+    # Очередь недоступна - одна фоновая задача обрабатывает все категории по очереди
+    background_tasks.add_task(scrape_and_store_categories, category_names)
     return {"status": "Скрапинг запущен в фоновом режиме"}
 
 @router.get("/categories", response_model=CategoryList)
 async def get_categories(
-    redis: Any = Depends(get_redis_sync)
+    redis: Any = Depends(get_redis_async)
 ):
     """Получить список всех доступных категорий"""
+    async with CATEGORIES_MEMO.lock:
+        categories = CATEGORIES_MEMO.get()
+        if categories is None:
+            categories = CATEGORIES_MEMO.set(await collect_categories(redis))
+        return categories
+
+async def collect_categories(redis: Any) -> Dict[str, List[str]]:
+    """Список категорий из кэша или Wiki вместе со встроенными категориями"""
     # Получаем категории
     try:
         # Сначала из кэша Redis
-        categories = redis.get_all_categories()
+        categories = await redis.get_all_categories()
         
         if not categories:
             # Если нет в кэше, получаем из API
-            categories = get_all_wiki_categories()
+            categories = await run_in_threadpool(get_all_wiki_categories)
             
             # И сохраняем в кэш
             if categories:
-                redis.set_all_categories(categories)
+                await redis.set_all_categories(categories)
         
         # Добавляем встроенные категории из конфигурации
         if not categories:
             categories = []
         
         # Добавляем ключи из CATEGORIES, если их нет в списке 
-        for cat_key in CATEGORIES.keys():
+        for cat_key in CATEGORIES:
             if cat_key not in categories:
                 categories.append(cat_key)
         
@@ -158,18 +198,26 @@ async def get_categories(
         logger.error(f"Ошибка получения категорий: {str(e)}")
         raise HTTPException(status_code=500, detail="Не удалось получить категории")
 
-@router.get("/categories/{category_name}", response_model=CategoryResult)
+async def stream_category_items(category_name: str, total: int,
+                                items: List[Dict[str, Any]]) -> AsyncIterator[bytes]:
+    """Потоковая сериализация ответа категории: элементы кодируются по одному"""
+    yield b'{"category":' + orjson.dumps(category_name) + b',"total":' + str(total).encode() + b',"items":['
+    for index, item in enumerate(items):
+        yield (b"," if index else b"") + orjson.dumps(item)
+    yield b"]}"
+
+@router.get("/categories/{category_name}", responses={200: {"model": CategoryResult}})
 async def get_category_items(
     background_tasks: BackgroundTasks,
     category_name: str = Path(..., description="Название категории"),
     limit: int = Query(settings.DEFAULT_ITEMS_LIMIT, description="Ограничение количества элементов"),
     offset: int = Query(0, description="Смещение для пагинации"),
     refresh: bool = Query(False, description="Принудительно обновить данные"),
-    redis: Any = Depends(get_redis_sync)
+    redis: Any = Depends(get_redis_async)
 ):
     """Получить элементы определенной категории"""
     # Проверяем существование категории
-    if category_name not in CATEGORIES:
+    if category_name not in CATEGORY_KEYS:
         raise HTTPException(status_code=404, detail=f"Категория '{category_name}' не найдена")
     
     # Проверяем наличие категории в кэше
@@ -177,8 +225,24 @@ async def get_category_items(
     need_refresh = refresh
     
     if not need_refresh:
+        # Если запрошена вся категория целиком, отдаем заранее сериализованный ответ
+        if offset == 0:
+            category_json = await redis.get_category_json(category_name)
+            if category_json and limit >= category_json["total"]:
+                return Response(content=category_json["body"], media_type="application/json")
+        
+        # Получаем только нужную страницу по индексу названий
+        category_page = await redis.get_category_page(category_name, offset, limit)
+        if category_page is not None:
+            total_items, paginated_items = category_page
+            return ORJSONResponse({
+                "category": category_name,
+                "total": total_items,
+                "items": paginated_items
+            })
+        
         # Получаем из Redis если не требуется обновление
-        category_data = redis.get_category_data(category_name)
+        category_data = await redis.get_category_data(category_name)
     
     # Если данных нет или требуется обновление
     if not category_data or need_refresh:
@@ -191,15 +255,15 @@ async def get_category_items(
                 try:
                     filepath = os.path.join(DATA_DIR, f"{category_name}.json")
                     if os.path.exists(filepath):
-                        with open(filepath, 'r', encoding='utf-8') as f:
-                            category_data = json.load(f)
+                        with open(filepath, 'rb') as f:
+                            category_data = orjson.loads(f.read())
                             logger.info(f"Категория {category_name} загружена с диска")
                 except Exception as e:
                     logger.error(f"Ошибка загрузки категории {category_name} с диска: {str(e)}")
             
             # Если всё еще нет данных, возвращаем что обработка началась
             if not category_data:
-                return JSONResponse(
+                return ORJSONResponse(
                     status_code=202,
                     content={"message": f"Данные для категории '{category_name}' обрабатываются. Пожалуйста, повторите запрос позже."}
                 )
@@ -215,77 +279,71 @@ async def get_category_items(
     
     # Если запрошенный offset больше общего количества элементов, возвращаем пустой список
     if offset >= total_items:
-        return CategoryResult(
-            category=category_name,
-            total=total_items,
-            items=[]
-        )
+        return ORJSONResponse({
+            "category": category_name,
+            "total": total_items,
+            "items": []
+        })
     
     # Получаем подмножество элементов
     paginated_items = items_list[offset:offset + limit]
     
-    # Форматируем в WikiItem
-    formatted_items = []
-    for item_data in paginated_items:
-        try:
-            wiki_item = WikiItem(**item_data)
-            formatted_items.append(wiki_item)
-        except Exception as e:
-            logger.error(f"Ошибка форматирования WikiItem: {str(e)}")
-    
-    return CategoryResult(
-        category=category_name,
-        total=total_items,
-        items=formatted_items
+    # Данные в кэше уже имеют формат WikiItem, повторная валидация не нужна.
+    # Отдаем элементы потоком, не собирая весь JSON-ответ в памяти
+    return StreamingResponse(
+        stream_category_items(category_name, total_items, paginated_items),
+        media_type="application/json"
     )
 
-@router.get("/items/{item_title}", response_model=WikiItem)
+@router.get("/items/{item_title}", responses={200: {"model": WikiItem}})
 async def get_item_details(
     background_tasks: BackgroundTasks,
     item_title: str = Path(..., description="Название элемента"),
-    redis: Any = Depends(get_redis_sync)
+    redis: Any = Depends(get_redis_async)
 ):
     """Получить детальную информацию по элементу"""
     try:
         # Пробуем получить из кэша Redis
-        item_data = redis.get_item_data(item_title)
+        item_data = await redis.get_item_data(item_title)
+        
+        if not item_data:
+            # Если нет в кэше, ищем категорию элемента по индексу
+            cat_key = await redis.get_item_category(item_title)
+            if cat_key:
+                category_data = await redis.get_category_data(cat_key)
+                if category_data and item_title in category_data:
+                    item_data = category_data[item_title]
+                    await redis.set_item_data(item_title, item_data)
         
         if not item_data:
-            # Если нет в кэше, запускаем поиск во всех категориях
-            for cat_key, cat_name in CATEGORIES.items():
-                category_data = redis.get_category_data(cat_key)
+            # Индекс не помог - запускаем поиск во всех категориях
+            for cat_key, cat_name in CATEGORY_ITEMS:
+                category_data = await redis.get_category_data(cat_key)
                 
                 if category_data and item_title in category_data:
                     item_data = category_data[item_title]
-                    redis.set_item_data(item_title, item_data)
+                    await redis.set_item_data(item_title, item_data)
                     break
         
         if not item_data:
             # Если всё еще нет, пробуем получить напрямую из Wiki
             try:
-                item_data = get_page_metadata(item_title)
+                # Сетевые запросы и запись файлов выполняем вне цикла событий
+                item_data = await run_in_threadpool(get_page_metadata, item_title)
                 
                 if item_data:
                     # Кэшируем полученные данные
-                    redis.set_item_data(item_title, item_data)
-                    
-                    # Сохраняем в файл для каждой возможной категории
-                    for category in CATEGORIES.keys():
-                        category_dir = os.path.join(DATA_DIR, category)
-                        os.makedirs(category_dir, exist_ok=True)
-                        
-                        # Используем безопасное имя файла
-                        safe_title = "".join(c if c.isalnum() else "_" for c in item_title)
-                        item_path = os.path.join(category_dir, f"{safe_title}.json")
-                        with open(item_path, 'w', encoding='utf-8') as f:
-                            json.dump(item_data, f, ensure_ascii=False, indent=2)
+                    await redis.set_item_data(item_title, item_data)
+                    await run_in_threadpool(save_item_files, item_title, item_data)
             except Exception as e:
                 logger.error(f"Ошибка получения метаданных для {item_title}: {str(e)}")
         
         if not item_data:
             raise HTTPException(status_code=404, detail=f"Элемент '{item_title}' не найден")
         
-        return WikiItem(**item_data)
+        # Проверяем и сериализуем элемент за один вызов pydantic-core, без повторной обработки в FastAPI
+        wiki_item = WIKI_ITEM_ADAPTER.validate_python(item_data)
+        return Response(content=WIKI_ITEM_ADAPTER.dump_json(wiki_item), media_type="application/json")
     except HTTPException:
         # Передаем исключение дальше
         raise
@@ -293,73 +351,92 @@ async def get_item_details(
         logger.error(f"Ошибка получения детальной информации для {item_title}: {str(e)}")
         raise HTTPException(status_code=500, detail="Ошибка получения детальной информации")
 
-def search_in_cache(query: str, categories: Optional[List[str]] = None, 
-                    redis: Any = get_redis_sync()) -> List[Dict[str, Any]]:
+async def search_in_cache(query: str, categories: Optional[List[str]] = None,
+                          redis: Any = None) -> List[Dict[str, Any]]:
     """Поиск в кэше Redis"""
+    if redis is None:
+        redis = await get_redis_async()
+    
     results = []
     
     # Нормализуем запрос
     normalized_query = query.lower().strip()
     
-    # Проверяем наличие кэшированных результатов поиска
-    cache_results = redis.get_search_results(normalized_query)
+    # Проверяем наличие кэшированных результатов поиска (ключ учитывает фильтр по категориям)
+    cache_results = await redis.get_search_results(normalized_query, categories)
     if cache_results:
-        # Фильтруем по категориям, если указаны
-        if categories:
-            return [item for item in cache_results if any(cat in item.get("categories", []) for cat in categories)]
         return cache_results
     
-    # Перебираем все категории в кэше
-    for cat_key, cat_name in CATEGORIES.items():
+    # Если доступен индекс RediSearch, поиск выполняется на стороне Redis
+    hits = await redis.search_index(normalized_query, categories, limit=settings.MAX_SEARCH_RESULTS)
+    if hits is not None:
+        # Данные всех найденных элементов получаем одним запросом
+        found: Dict[str, Dict[str, Any]] = {}
+        for (title, cat_key), item_data in zip(hits, await redis.get_items_data([title for title, _ in hits])):
+            item_data = found.get(title) or item_data
+            if not item_data:
+                continue
+            
+            # Добавляем категорию в элемент, как и при поиске по данным категорий
+            item_categories = item_data.setdefault("categories", [])
+            if cat_key not in item_categories:
+                item_categories.append(cat_key)
+            found[title] = item_data
+        
+        results = list(found.values())
+        await redis.set_search_results(normalized_query, results, categories)
+        return results
+    
+    # Иначе перебираем все категории в кэше
+    for cat_key, cat_name in CATEGORY_ITEMS:
         # Если фильтр по категориям и текущая категория не в списке, пропускаем
         if categories and cat_key not in categories and cat_name not in categories:
             continue
             
-        category_data = redis.get_category_data(cat_key)
+        category_data = await redis.get_category_data(cat_key)
         if not category_data:
             continue
             
-        # Ищем в данных категории
-        for title, item_data in category_data.items():
-            item_matched = False
+        # Берем заранее подготовленный текст для поиска или строим его на лету
+        search_corpus = await redis.get_search_corpus(cat_key)
+        if not search_corpus:
+            search_corpus = build_search_corpus(category_data)
+        
+        # Ищем в данных категории: единственная проверка подстроки на элемент в одном проходе
+        matched_titles = [title for title, search_text in search_corpus if normalized_query in search_text]
+        
+        for title in matched_titles:
+            item_data = category_data.get(title)
+            if not item_data:
+                continue
             
-            # Проверяем название
-            if normalized_query in title.lower():
-                item_matched = True
-            # Проверяем описание
-            elif item_data.get("description") and normalized_query in item_data["description"].lower():
-                item_matched = True
-            # Проверяем секции
-            elif item_data.get("sections"):
-                for section in item_data["sections"]:
-                    if normalized_query in section.get("title", "").lower() or normalized_query in section.get("content", "").lower():
-                        item_matched = True
-                        break
+            # Добавляем категорию в элемент, если она отсутствует
+            if "categories" not in item_data:
+                item_data["categories"] = []
+            if cat_key not in item_data["categories"]:
+                item_data["categories"].append(cat_key)
             
-            if item_matched:
-                # Добавляем категорию в элемент, если она отсутствует
-                if "categories" not in item_data:
-                    item_data["categories"] = []
-                if cat_key not in item_data["categories"]:
-                    item_data["categories"].append(cat_key)
-                
-                results.append(item_data)
+            results.append(item_data)
+        
+        # Больше результатов не понадобится - остальные категории не просматриваем
+        if len(results) >= settings.MAX_SEARCH_RESULTS:
+            break
     
     # Ограничиваем количество результатов чтобы не перегружать кэш
     results = results[:settings.MAX_SEARCH_RESULTS]
     
     # Кэшируем результаты поиска
-    redis.set_search_results(normalized_query, results)
+    await redis.set_search_results(normalized_query, results, categories)
     
     return results
 
-@router.get("/search", response_model=SearchResult)
+@router.get("/search", responses={200: {"model": SearchResult}})
 async def search_items(
     q: str = Query(..., description="Поисковый запрос"),
     categories: Optional[List[str]] = Query(None, description="Фильтр по категориям"),
     limit: int = Query(settings.SEARCH_ITEMS_LIMIT, description="Ограничение количества результатов"),
     offset: int = Query(0, description="Смещение для пагинации"),
-    redis: Any = Depends(get_redis_sync)
+    redis: Any = Depends(get_redis_async)
 ):
     """Поиск элементов по запросу"""
     if not q or len(q.strip()) < 2:
@@ -367,26 +444,18 @@ async def search_items(
     
     try:
         # Ищем в кэше
-        results = search_in_cache(q, categories, redis)
+        results = await search_in_cache(q, categories, redis)
         
         # Применяем пагинацию
         total_results = len(results)
         paginated_results = results[offset:offset + limit]
         
-        # Форматируем результаты
-        formatted_results = []
-        for item_data in paginated_results:
-            try:
-                wiki_item = WikiItem(**item_data)
-                formatted_results.append(wiki_item)
-            except Exception as e:
-                logger.error(f"Ошибка форматирования результата поиска: {str(e)}")
-        
-        return SearchResult(
-            query=q,
-            total=total_results,
-            results=formatted_results
-        )
+        # Результаты берутся из кэша в формате WikiItem, повторная валидация не нужна
+        return ORJSONResponse({
+            "query": q,
+            "total": total_results,
+            "results": paginated_results
+        })
     except Exception as e:
         logger.error(f"Ошибка поиска: {str(e)}")
         raise HTTPException(status_code=500, detail="Ошибка выполнения поиска")
@@ -399,13 +468,12 @@ async def refresh_category(
 ):
     """Принудительно обновить данные категории"""
     # Проверяем, существует ли категория
-    if category_name not in CATEGORIES.keys() and category_name != "all":
+    if category_name not in CATEGORY_KEYS and category_name != "all":
         raise HTTPException(status_code=404, detail=f"Категория '{category_name}' не найдена")
     
     if category_name == "all":
         # Обновляем все категории
-        for cat_key in CATEGORIES.keys():
-            await scrape_category_async(cat_key, background_tasks)
+        await scrape_categories_async(list(CATEGORIES), background_tasks)
         return {"status": "success", "message": "Обновление всех категорий запущено в фоновом режиме"}
     else:
         # Обновляем одну категорию
@@ -420,13 +488,13 @@ async def clear_cache(
     try:
         if not categories:
             # Очищаем весь кэш
-            result = redis_cache.clear_all_cache()
+            result = await run_in_threadpool(redis_cache.clear_all_cache)
             message = "Весь кэш успешно очищен"
         else:
             # Очищаем только указанные категории
             cleared = []
             for cat in categories:
-                if redis_cache.invalidate_category(cat):
+                if await run_in_threadpool(redis_cache.invalidate_category, cat):
                     cleared.append(cat)
             
             message = f"Кэш категорий [{', '.join(cleared)}] успешно очищен" if cleared else "Ни одна категория не была очищена"
@@ -11,19 +11,219 @@
 """
 
 import os
+import re
+import gc
+import time
+import hashlib
+import threading
 import json
+import anyio.to_thread
 import redis
+import redis.asyncio
 import pickle
+import orjson
+import msgspec
+import zstandard
 import logging
 from pathlib import Path
-from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional, Union
+from typing import Dict, List, Any, Optional, Tuple, Union
+from collections import OrderedDict
+
+from redis.commands.search.field import TextField, TagField
+from redis.commands.search.indexDefinition import IndexDefinition, IndexType
+from redis.commands.search.query import Query
 
 from src.core.config import settings
 
 # Логгер для модуля redis_cache
 logger = logging.getLogger("wiki_api.redis_cache")
 
+# Формат значений в кэше: байт версии + msgpack. Значения - только dict/list/str/int/float/bytes
+MSGPACK_FORMAT = b"\x01"
+_MSGPACK_ENCODER = msgspec.msgpack.Encoder()
+_MSGPACK_DECODER = msgspec.msgpack.Decoder()
+
+# Значения больше порога хранятся сжатыми zstd: байт версии + zstd(msgpack)
+ZSTD_FORMAT = b"\x02"
+ZSTD_MIN_SIZE = 1024
+ZSTD_LEVEL = 3
+
+# Объекты zstandard нельзя использовать одновременно из нескольких потоков
+_zstd_local = threading.local()
+
+def _zstd_compressor() -> zstandard.ZstdCompressor:
+    """Компрессор zstd текущего потока"""
+    compressor = getattr(_zstd_local, "compressor", None)
+    if compressor is None:
+        compressor = _zstd_local.compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL)
+    return compressor
+
+def _zstd_decompressor() -> zstandard.ZstdDecompressor:
+    """Декомпрессор zstd текущего потока"""
+    decompressor = getattr(_zstd_local, "decompressor", None)
+    if decompressor is None:
+        decompressor = _zstd_local.decompressor = zstandard.ZstdDecompressor()
+    return decompressor
+
+# Символы, недопустимые в именах файлов кэша, и максимальная длина имени в байтах.
+# Ограничение ФС (255 байт) относится ко всему имени, поэтому оставлен запас
+# для расширения .cache и временного суффикса .{pid}.tmp
+_SAFE_KEY_TBL = str.maketrans({char: "_" for char in '/:?\\*"<>|'})
+MAX_FILE_KEY_LENGTH = 200
+
+# Полнотекстовый индекс RediSearch по элементам Wiki
+SEARCH_INDEX_NAME = "wiki_idx"
+SEARCH_DOC_PREFIX = "doc:"
+
+# Спецсимволы синтаксиса запросов RediSearch, которые нужно экранировать
+_SEARCH_ESCAPE_RE = re.compile(r"([^\w\s])")
+
+def encode_value(value: Any) -> bytes:
+    """Сериализация значения для кэша в msgpack с байтом версии формата"""
+    payload = _MSGPACK_ENCODER.encode(value)
+    if len(payload) > ZSTD_MIN_SIZE:
+        return ZSTD_FORMAT + _zstd_compressor().compress(payload)
+    return MSGPACK_FORMAT + payload
+
+def decode_value(data: bytes) -> Any:
+    """Десериализация значения из кэша с поддержкой старых записей в pickle"""
+    if data[:1] == MSGPACK_FORMAT:
+        return _MSGPACK_DECODER.decode(memoryview(data)[1:])
+    if data[:1] == ZSTD_FORMAT:
+        return _MSGPACK_DECODER.decode(_zstd_decompressor().decompress(memoryview(data)[1:]))
+    # Записи, сохраненные до перехода на msgpack. pickle только читается:
+    # новые значения всегда пишутся в msgpack, протокол pickle определяется автоматически
+    return pickle.loads(data)
+
+# Начиная с этого количества значений пакетное декодирование идет с отключенным gc
+GC_FREE_DECODE_MIN = 8
+
+def decode_many(blobs: List[Optional[bytes]]) -> List[Any]:
+    """
+    Пакетная десериализация значений из кэша (None для отсутствующих).
+    На больших пакетах отключает сборщик мусора: декодирование создает много
+    мелких объектов, и без этого на них многократно срабатывает gc поколения 0.
+    """
+    if len(blobs) <= GC_FREE_DECODE_MIN or not gc.isenabled():
+        return [decode_value(blob) if blob else None for blob in blobs]
+    
+    gc.disable()
+    try:
+        return [decode_value(blob) if blob else None for blob in blobs]
+    finally:
+        gc.enable()
+
+# Знаки препинания и прочие символы, которые не участвуют в поиске
+_NORMALIZE_RE = re.compile(r"[^\w\s]+")
+
+def normalize_text(text: str) -> str:
+    """
+    Нормализует поисковый запрос: убирает знаки препинания,
+    лишние пробелы и приводит к нижнему регистру.
+    """
+    return " ".join(_NORMALIZE_RE.sub(" ", text).lower().split())
+
+def suggestions_index_key(category: str) -> str:
+    """
+    Индекс автодополнения категории: sorted set с одинаковым score,
+    элементы "нормализованное название с i-го слова\0название"
+    """
+    return f"suggestions:index:{category}"
+
+def suggestion_members(title: str) -> List[str]:
+    """
+    Элементы индекса автодополнения для названия: по одному на каждое слово,
+    чтобы префикс запроса совпадал с началом любого слова названия, как
+    в префиксном полнотекстовом запросе SearchEngine
+    """
+    words = normalize_text(title).split()
+    return [f"{' '.join(words[i:])}\0{title}" for i in range(len(words))]
+
+# Ключи кэша, общие для RedisCache и AsyncRedisCache
+ALL_CATEGORIES_KEY = "all_categories"
+TITLE_INDEX_KEY = "title2cat"
+
+def category_key(category: str) -> str:
+    """Ключ данных категории"""
+    return f"category:{category}"
+
+def category_json_key(category: str) -> str:
+    """Ключ готового JSON-ответа категории"""
+    return f"cat:{category}:json"
+
+def category_index_key(category: str) -> str:
+    """Ключ списка названий элементов категории"""
+    return f"cat:{category}:index"
+
+def search_corpus_key(category: str) -> str:
+    """Ключ подготовленного текста для поиска по категории"""
+    return f"search_corpus:{category}"
+
+def item_key(title: str) -> str:
+    """Ключ данных элемента"""
+    return f"item:{title}"
+
+def search_results_key(query: str, categories: Optional[List[str]] = None) -> str:
+    """Ключ результатов поиска; результаты с фильтром по категориям хранятся отдельно"""
+    if categories:
+        return f"search:{query}|{','.join(sorted(categories))}"
+    return f"search:{query}"
+
+def search_doc_key(category: str, title: str) -> str:
+    """Ключ документа RediSearch: категория в ключе позволяет удалять документы категории по префиксу"""
+    return f"{SEARCH_DOC_PREFIX}{category}:{title}"
+
+def parse_search_doc_key(doc_id: str) -> Tuple[str, str]:
+    """Разбор ключа документа RediSearch на (название, категория)"""
+    category, title = doc_id[len(SEARCH_DOC_PREFIX):].split(":", 1)
+    return title, category
+
+def search_keys_tag(category: str) -> str:
+    """Ключ множества с ключами кэша поиска, зависящими от категории"""
+    return f"search_keys:{category}"
+
+# Фильтр поиска принимает и ключи, и названия категорий
+_CATEGORY_KEYS = {**{key: key for key in settings.CATEGORIES}, **{name: key for key, name in settings.CATEGORIES.items()}}
+
+def search_results_tags(categories: Optional[List[str]] = None) -> List[str]:
+    """
+    Множества, в которые регистрируются результаты поиска (см. invalidate_search_cache):
+    результаты без фильтра зависят от всех категорий, с фильтром - только от выбранных
+    """
+    if not categories:
+        return [search_keys_tag(key) for key in settings.CATEGORIES]
+    keys = {_CATEGORY_KEYS[category] for category in categories if category in _CATEGORY_KEYS}
+    return [search_keys_tag(key) for key in keys]
+
+def build_search_index_query(query: str, categories: Optional[List[str]] = None) -> str:
+    """Построение запроса RediSearch: префиксный поиск по каждому слову и фильтр по категориям"""
+    terms = [_SEARCH_ESCAPE_RE.sub(r"\\\1", term) for term in query.split()]
+    if not terms:
+        return ""
+    
+    search_query = " ".join(f"{term}*" for term in terms)
+    if categories:
+        tags = "|".join(_SEARCH_ESCAPE_RE.sub(r"\\\1", cat) for cat in categories)
+        search_query = f"{search_query} @categories:{{{tags}}}"
+    return search_query
+
+# Общий пул соединений процесса: все экземпляры RedisCache используют одни сокеты
+_connection_pool: Optional[redis.BlockingConnectionPool] = None
+
+def get_connection_pool() -> redis.BlockingConnectionPool:
+    """Получение общего пула соединений с Redis с ограниченным числом соединений"""
+    global _connection_pool
+    if _connection_pool is None:
+        # REDIS_URL собран из настроек и указывает на UNIX-сокет, если он задан
+        _connection_pool = redis.BlockingConnectionPool.from_url(
+            settings.REDIS_URL,
+            max_connections=settings.REDIS_POOL_SIZE,
+            timeout=5,  # Ожидание свободного соединения из пула
+            socket_timeout=5,
+            socket_connect_timeout=5
+        )
+    return _connection_pool
+
 class RedisCache:
     """Класс для работы с Redis кэшем"""
     
@@ -38,18 +238,18 @@ class RedisCache:
         self.file_cache_dir = settings.TEMP_DIR
         self.use_redis = settings.USE_REDIS_CACHE
         
+        # Локальный LRU-кэш горячих ключей: ключ -> (время истечения, закодированное значение).
+        # Кэш свой у каждого процесса uvicorn и не сбрасывается при изменениях из других процессов:
+        # устаревшие данные видны не дольше _local_ttl секунд
+        self._local: OrderedDict = OrderedDict()
+        self._local_cap = 1024
+        self._local_ttl = 30
+        self._local_lock = threading.Lock()
+        
         # Инициализация Redis клиента
         if self.use_redis:
             try:
-                self.redis_client = redis.Redis(
-                    host=self.redis_host,
-                    port=self.redis_port,
-                    db=self.redis_db,
-                    password=self.redis_password,
-                    decode_responses=False,  # Важно для pickle
-                    socket_timeout=5,
-                    socket_connect_timeout=5
-                )
+                self.redis_client = redis.Redis(connection_pool=get_connection_pool())
                 logger.info(f"Инициализировано подключение к Redis: {self.redis_host}:{self.redis_port}")
             except Exception as e:
                 logger.error(f"Ошибка подключения к Redis: {str(e)}")
@@ -75,33 +275,101 @@ class RedisCache:
     def _get_file_path(self, key: str) -> Path:
         """Получение пути к файлу кэша"""
         # Заменяем запрещенные символы в имени файла
-        safe_key = key.replace('/', '_').replace(':', '_').replace('?', '_')
-        return Path(self.file_cache_dir) / f"{safe_key}.cache"
+        safe_key = key.translate(_SAFE_KEY_TBL)
+        encoded_key = safe_key.encode()
+        if len(encoded_key) > MAX_FILE_KEY_LENGTH:
+            # Слишком длинные имена обрезаем и добавляем хэш ключа, чтобы не упереться в ограничения ФС.
+            # Длина считается в байтах: кириллица в UTF-8 занимает 2 байта на символ,
+            # а неполный символ на границе среза отбрасывается
+            digest = hashlib.blake2b(key.encode(), digest_size=8).hexdigest()
+            prefix = encoded_key[:MAX_FILE_KEY_LENGTH - len(digest) - 1].decode("utf-8", "ignore")
+            safe_key = f"{prefix}_{digest}"
+        # Раскладываем файлы по 256 подкаталогам, чтобы не держать тысячи файлов в одном каталоге
+        shard = hashlib.blake2b(key.encode(), digest_size=1).hexdigest()
+        return Path(self.file_cache_dir) / shard / f"{safe_key}.cache"
+    
+    def _local_get(self, key: str) -> Any:
+        """
+        Получение данных из локального LRU-кэша процесса.
+        Значение декодируется при каждом обращении, поэтому вызывающий код
+        получает свой объект и может изменять его, не затрагивая кэш.
+        """
+        with self._local_lock:
+            entry = self._local.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                del self._local[key]
+                return None
+            self._local.move_to_end(key)
+            payload = entry[1]
+        return decode_value(payload)
+    
+    def _local_set(self, key: str, payload: Optional[bytes], ttl: Optional[int] = None) -> None:
+        """Сохранение закодированных данных в локальный LRU-кэш процесса"""
+        if not payload:
+            self._local_pop(key)
+            return
+        
+        # Держим запись не дольше TTL кэша и не дольше 30 секунд,
+        # чтобы изменения из других процессов были видны быстро
+        local_ttl = min(ttl, self._local_ttl) if ttl and ttl > 0 else self._local_ttl
+        with self._local_lock:
+            self._local[key] = (time.monotonic() + local_ttl, payload)
+            self._local.move_to_end(key)
+            while len(self._local) > self._local_cap:
+                self._local.popitem(last=False)
+    
+    def _local_pop(self, key: str) -> None:
+        """Удаление данных из локального LRU-кэша процесса"""
+        with self._local_lock:
+            self._local.pop(key, None)
     
     def get(self, key: str) -> Any:
         """Получение данных из кэша"""
+        value = self._local_get(key)
+        if value is not None:
+            return value
+        
         if self.use_redis:
             try:
                 data = self.redis_client.get(key)
                 if data:
-                    return pickle.loads(data)
+                    self._local_set(key, data)
+                    return decode_value(data)
             except Exception as e:
                 logger.error(f"Ошибка получения данных из Redis: {str(e)}")
         
         # Если Redis недоступен или данных нет - пробуем из файла
+        return self._get_fallback(key)
+    
+    def _get_fallback(self, key: str) -> Any:
+        """Получение данных из файлового кэша с сохранением в локальный кэш"""
+        data = self._get_file(key)
+        self._local_set(key, data)
+        return decode_value(data) if data else None
+    
+    def _get_fallback_many(self, keys: List[str]) -> List[Any]:
+        """Получение нескольких значений из файлового кэша"""
+        return [self._get_fallback(key) for key in keys]
+    
+    def _get_file(self, key: str) -> Optional[bytes]:
+        """Получение закодированных данных из файлового кэша"""
         try:
             file_path = self._get_file_path(key)
-            if file_path.exists():
-                # Проверяем TTL для файлового кэша
-                if self.ttl > 0:
-                    modified_time = datetime.fromtimestamp(file_path.stat().st_mtime)
-                    if datetime.now() - modified_time > timedelta(seconds=self.ttl):
-                        # Кэш устарел
-                        file_path.unlink(missing_ok=True)
-                        return None
-                
-                with open(file_path, 'rb') as f:
-                    return pickle.load(f)
+            try:
+                stat = file_path.stat()
+            except FileNotFoundError:
+                return None
+            
+            # Проверяем TTL для файлового кэша
+            if self.ttl > 0 and time.time() - stat.st_mtime > self.ttl:
+                # Кэш устарел
+                file_path.unlink(missing_ok=True)
+                return None
+            
+            with open(file_path, 'rb') as f:
+                return f.read()
         except Exception as e:
             logger.error(f"Ошибка получения данных из файлового кэша: {str(e)}")
         
@@ -113,32 +381,94 @@ class RedisCache:
             ttl = self.ttl
         
         success = False
+        payload = encode_value(value)
+        self._local_set(key, payload, ttl)
         
         # Сначала пробуем сохранить в Redis
         if self.use_redis:
             try:
-                pickled_value = pickle.dumps(value)
                 if ttl > 0:
-                    success = self.redis_client.setex(key, ttl, pickled_value)
+                    success = self.redis_client.setex(key, ttl, payload)
                 else:
-                    success = self.redis_client.set(key, pickled_value)
+                    success = self.redis_client.set(key, payload)
             except Exception as e:
                 logger.error(f"Ошибка сохранения данных в Redis: {str(e)}")
         
-        # Если Redis недоступен или сохранение не удалось - сохраняем в файл
+        # Файловый кэш - только запасной вариант, если Redis недоступен или сохранение не удалось
+        if not success:
+            success = self._set_file(key, payload)
+        
+        return bool(success)
+    
+    def _set_file(self, key: str, payload: bytes) -> bool:
+        """Сохранение закодированных данных в файловый кэш"""
         try:
             file_path = self._get_file_path(key)
-            with open(file_path, 'wb') as f:
-                pickle.dump(value, f)
-            success = True
+            os.makedirs(file_path.parent, exist_ok=True)
+            # Пишем во временный файл и атомарно подменяем, чтобы не оставлять обрезанных записей
+            tmp_path = file_path.with_suffix(f".{os.getpid()}.tmp")
+            with open(tmp_path, 'wb') as f:
+                f.write(payload)
+            os.replace(tmp_path, file_path)
+            return True
         except Exception as e:
             logger.error(f"Ошибка сохранения данных в файловом кэше: {str(e)}")
+            return False
+    
+    def mset_many(self, mapping: Dict[str, Any], ttl: Optional[int] = None) -> bool:
+        """Пакетное сохранение данных в кэш за один запрос к Redis"""
+        if ttl is None:
+            ttl = self.ttl
+        
+        success = False
+        payloads = {key: encode_value(value) for key, value in mapping.items()}
+        for key, payload in payloads.items():
+            self._local_set(key, payload, ttl)
+        
+        # Отправляем все команды одним pipeline вместо отдельного запроса на каждый ключ
+        if self.use_redis:
+            try:
+                pipe = self.redis_client.pipeline(transaction=False)
+                for key, payload in payloads.items():
+                    if ttl > 0:
+                        pipe.setex(key, ttl, payload)
+                    else:
+                        pipe.set(key, payload)
+                success = all(pipe.execute())
+            except redis.exceptions.RedisError as e:
+                logger.error(f"Ошибка пакетного сохранения в Redis, сохраняем по одному ключу: {str(e)}")
+                return all([self.set(key, value, ttl) for key, value in mapping.items()])
+        
+        # Как и в set(), файловый кэш используется только если Redis не сохранил данные
+        if not success:
+            success = all([self._set_file(key, payload) for key, payload in payloads.items()])
         
         return success
     
+    def mget_many(self, keys: List[str]) -> List[Any]:
+        """Пакетное получение данных из кэша за один запрос к Redis"""
+        values = [self._local_get(key) for key in keys]
+        missing = [index for index, value in enumerate(values) if value is None]
+        
+        blobs = [None] * len(missing)
+        if self.use_redis and missing:
+            try:
+                blobs = self.redis_client.mget([keys[i] for i in missing])
+            except Exception as e:
+                logger.error(f"Ошибка пакетного получения данных из Redis: {str(e)}")
+        
+        # Недостающие значения пробуем получить из файлового кэша
+        blobs = [blob or self._get_file(keys[index]) for index, blob in zip(missing, blobs)]
+        for index, blob, value in zip(missing, blobs, decode_many(blobs)):
+            self._local_set(keys[index], blob)
+            values[index] = value
+        
+        return values
+    
     def delete(self, key: str) -> bool:
         """Удаление данных из кэша"""
         success = False
+        self._local_pop(key)
         
         # Удаляем из Redis
         if self.use_redis:
@@ -148,11 +478,9 @@ class RedisCache:
             except Exception as e:
                 logger.error(f"Ошибка удаления данных из Redis: {str(e)}")
         
-        # Удаляем из файлового кэша
+        # Удаляем из файлового кэша (там могла остаться запись, пока Redis был недоступен)
         try:
-            file_path = self._get_file_path(key)
-            if file_path.exists():
-                file_path.unlink()
+            self._get_file_path(key).unlink(missing_ok=True)
             success = True
         except Exception as e:
             logger.error(f"Ошибка удаления данных из файлового кэша: {str(e)}")
@@ -162,6 +490,8 @@ class RedisCache:
     def flush(self) -> bool:
         """Очистка всего кэша"""
         success = False
+        with self._local_lock:
+            self._local.clear()
         
         # Очищаем Redis
         if self.use_redis:
@@ -174,7 +504,7 @@ class RedisCache:
         # Очищаем файловый кэш
         try:
             cache_dir = Path(self.file_cache_dir)
-            for cache_file in cache_dir.glob("*.cache"):
+            for cache_file in cache_dir.rglob("*.cache"):
                 cache_file.unlink()
             success = True
         except Exception as e:
@@ -184,36 +514,576 @@ class RedisCache:
     
     def set_all_categories(self, categories: Dict[str, Any]) -> bool:
         """Сохранение всех категорий в кэш"""
-        return self.set("all_categories", categories)
+        return self.set(ALL_CATEGORIES_KEY, categories)
     
     def get_all_categories(self) -> Dict[str, Any]:
         """Получение всех категорий из кэша"""
-        return self.get("all_categories") or {}
+        return self.get(ALL_CATEGORIES_KEY) or {}
     
     def set_category_data(self, category: str, data: List[Dict[str, Any]]) -> bool:
         """Сохранение данных категории в кэш"""
-        return self.set(f"category:{category}", data)
+        return self.set(category_key(category), data)
     
     def get_category_data(self, category: str) -> List[Dict[str, Any]]:
         """Получение данных категории из кэша"""
-        return self.get(f"category:{category}") or []
+        return self.get(category_key(category)) or []
+    
+    def set_category_json(self, category: str, data: Dict[str, Dict[str, Any]]) -> bool:
+        """Сохранение готового JSON-ответа со всеми элементами категории"""
+        body = orjson.dumps({
+            "category": category,
+            "total": len(data),
+            "items": list(data.values())
+        })
+        return self.set(category_json_key(category), {"total": len(data), "body": body})
+    
+    def get_category_json(self, category: str) -> Dict[str, Any]:
+        """Получение готового JSON-ответа категории из кэша"""
+        return self.get(category_json_key(category)) or {}
+    
+    def set_category_index(self, category: str, titles: List[str]) -> bool:
+        """Сохранение упорядоченного списка названий элементов категории для пагинации"""
+        if not self.use_redis:
+            return False
+        
+        key = category_index_key(category)
+        try:
+            pipe = self.redis_client.pipeline(transaction=True)
+            pipe.delete(key)
+            if titles:
+                pipe.rpush(key, *titles)
+                if self.ttl > 0:
+                    pipe.expire(key, self.ttl)
+            pipe.execute()
+            return True
+        except Exception as e:
+            logger.error(f"Ошибка сохранения индекса категории {category} в Redis: {str(e)}")
+            return False
+    
+    def set_search_corpus(self, category: str, corpus: List[Tuple[str, str]]) -> bool:
+        """Сохранение подготовленного текста для поиска по категории"""
+        return self.set(search_corpus_key(category), corpus)
+    
+    def get_search_corpus(self, category: str) -> List[Tuple[str, str]]:
+        """Получение подготовленного текста для поиска по категории"""
+        return self.get(search_corpus_key(category)) or []
+    
+    def invalidate_category(self, category: str) -> bool:
+        """Удаление данных категории из кэша"""
+        deleted_data = self.delete(category_key(category))
+        deleted_json = self.delete(category_json_key(category))
+        deleted_corpus = self.delete(search_corpus_key(category))
+        deleted_index = self.delete(category_index_key(category))
+        deleted_docs = self._delete_search_documents(category)
+        deleted_suggestions = self.delete(suggestions_index_key(category))
+        deleted_search = self.invalidate_search_cache(category)
+        return (deleted_data and deleted_json and deleted_corpus and deleted_index
+                and deleted_docs and deleted_suggestions and deleted_search)
+    
+    def invalidate_search_cache(self, category: str) -> bool:
+        """
+        Удаление закэшированных результатов поиска, зависящих от категории.
+        Ключи берутся из множества search_keys:{category}, в которое их регистрируют
+        set_search_results и SearchEngine.
+        """
+        if not self.use_redis:
+            return True
+        
+        tag = search_keys_tag(category)
+        try:
+            keys = self.redis_client.smembers(tag)
+            # Сбрасываем и локальный кэш процесса, иначе он отдавал бы старые результаты до истечения _local_ttl
+            for key in keys:
+                self._local_pop(key.decode("utf-8") if isinstance(key, bytes) else key)
+            # UNLINK освобождает память в фоне и не блокирует Redis
+            pipe = self.redis_client.pipeline(transaction=False)
+            if keys:
+                pipe.unlink(*keys)
+            pipe.unlink(tag)
+            pipe.execute()
+            return True
+        except Exception as e:
+            logger.error(f"Ошибка очистки кэша поиска категории {category}: {str(e)}")
+            return False
+    
+    def clear_all_cache(self) -> bool:
+        """Очистка всего кэша"""
+        return self.flush()
+    
+    def which_categories_cached(self, categories: List[str]) -> List[str]:
+        """Список категорий, данные которых есть в кэше"""
+        if self.use_redis:
+            try:
+                # Проверяем все ключи одним pipeline вместо GET на каждую категорию
+                pipe = self.redis_client.pipeline(transaction=False)
+                for category in categories:
+                    pipe.exists(category_key(category))
+                flags = pipe.execute()
+                return [category for category, flag in zip(categories, flags) if flag]
+            except Exception as e:
+                logger.error(f"Ошибка проверки категорий в Redis: {str(e)}")
+        
+        return self._which_categories_in_files(categories)
+    
+    def _which_categories_in_files(self, categories: List[str]) -> List[str]:
+        """Список категорий, данные которых есть в файловом кэше"""
+        return [category for category in categories if self._get_file_path(category_key(category)).exists()]
     
-    def set_item_data(self, category: str, item_id: str, data: Dict[str, Any]) -> bool:
+    def set_item_data(self, title: str, data: Dict[str, Any]) -> bool:
         """Сохранение данных элемента в кэш"""
-        return self.set(f"item:{category}:{item_id}", data)
+        return self.set(item_key(title), data)
     
-    def get_item_data(self, category: str, item_id: str) -> Dict[str, Any]:
+    def get_item_data(self, title: str) -> Dict[str, Any]:
         """Получение данных элемента из кэша"""
-        return self.get(f"item:{category}:{item_id}") or {}
+        return self.get(item_key(title)) or {}
+    
+    def set_items_bulk(self, items: Dict[str, Dict[str, Any]], category: Optional[str] = None) -> bool:
+        """Пакетное сохранение элементов (и, опционально, всей категории) в кэш"""
+        mapping = {item_key(title): data for title, data in items.items()}
+        if category:
+            mapping[category_key(category)] = items
+            self.set_item_categories(category, list(items.keys()))
+        return self.mset_many(mapping)
+    
+    def set_item_categories(self, category: str, titles: List[str]) -> bool:
+        """Сохранение индекса "название элемента -> категория" """
+        if not titles:
+            return True
+        
+        if self.use_redis:
+            try:
+                self.redis_client.hset(TITLE_INDEX_KEY, mapping={title: category for title in titles})
+                return True
+            except Exception as e:
+                logger.error(f"Ошибка сохранения индекса элементов в Redis: {str(e)}")
+        
+        # Без Redis храним индекс целиком в файловом кэше
+        index = self.get(TITLE_INDEX_KEY) or {}
+        index.update({title: category for title in titles})
+        return self.set(TITLE_INDEX_KEY, index, ttl=0)
+    
+    def set_suggestions(self, category: str, titles: List[str]) -> bool:
+        """
+        Перестроение индекса автодополнения категории (см. suggestions_index_key).
+        Индекс заменяется целиком, поэтому названия удаленных элементов в нем не остаются.
+        Префиксный поиск по нему выполняет ZRANGEBYLEX (см. SearchEngine.get_suggestions)
+        """
+        if not self.use_redis:
+            return True
+        
+        key = suggestions_index_key(category)
+        try:
+            pipe = self.redis_client.pipeline(transaction=True)
+            pipe.delete(key)
+            members = {member: 0 for title in titles for member in suggestion_members(title)}
+            if members:
+                pipe.zadd(key, members)
+            pipe.execute()
+            return True
+        except Exception as e:
+            logger.error(f"Ошибка сохранения индекса автодополнения в Redis: {str(e)}")
+            return False
     
-    def set_search_results(self, query: str, results: List[Dict[str, Any]]) -> bool:
-        """Сохранение результатов поиска в кэш"""
+    def get_item_category(self, title: str) -> Optional[str]:
+        """Получение категории элемента по индексу"""
+        if self.use_redis:
+            try:
+                category = self.redis_client.hget(TITLE_INDEX_KEY, title)
+                return category.decode("utf-8") if category else None
+            except Exception as e:
+                logger.error(f"Ошибка получения индекса элементов из Redis: {str(e)}")
+        
+        return (self.get(TITLE_INDEX_KEY) or {}).get(title)
+    
+    def set_search_results(self, query: str, results: List[Dict[str, Any]],
+                           categories: Optional[List[str]] = None) -> bool:
+        """Сохранение результатов поиска в кэш с регистрацией для сброса при обновлении категорий"""
+        key = search_results_key(query, categories)
         # Для поиска используем меньший TTL
-        return self.set(f"search:{query}", results, ttl=settings.SEARCH_CACHE_TTL)
+        success = self.set(key, results, ttl=settings.SEARCH_CACHE_TTL)
+        
+        if self.use_redis:
+            try:
+                pipe = self.redis_client.pipeline(transaction=False)
+                for tag in search_results_tags(categories):
+                    pipe.sadd(tag, key)
+                    pipe.expire(tag, settings.SEARCH_CACHE_TTL)
+                pipe.execute()
+            except Exception as e:
+                logger.error(f"Ошибка регистрации результатов поиска в Redis: {str(e)}")
+        
+        return success
     
-    def get_search_results(self, query: str) -> List[Dict[str, Any]]:
+    def _ensure_search_index(self) -> bool:
+        """Создание индекса RediSearch, если он еще не существует"""
+        if not self.use_redis:
+            return False
+        
+        index = self.redis_client.ft(SEARCH_INDEX_NAME)
+        try:
+            index.info()
+            return True
+        except redis.exceptions.ResponseError:
+            pass
+        
+        try:
+            index.create_index(
+                [
+                    TextField("title", weight=2.0),
+                    TextField("description", weight=1.5),
+                    TextField("content"),
+                    TagField("categories"),
+                ],
+                definition=IndexDefinition(prefix=[SEARCH_DOC_PREFIX], index_type=IndexType.HASH),
+            )
+            return True
+        except Exception as e:
+            # Модуль RediSearch не установлен на сервере
+            logger.warning(f"Индекс RediSearch недоступен: {str(e)}")
+            return False
+    
+    def _delete_search_documents(self, category: str) -> bool:
+        """Удаление документов категории из полнотекстового индекса"""
+        if not self.use_redis:
+            return True
+        
+        try:
+            batch = []
+            # SCAN вместо KEYS, чтобы не блокировать Redis на большой базе
+            for key in self.redis_client.scan_iter(match=search_doc_key(category, "*"), count=1000):
+                batch.append(key)
+                if len(batch) >= 1000:
+                    self.redis_client.unlink(*batch)
+                    batch = []
+            if batch:
+                self.redis_client.unlink(*batch)
+            return True
+        except Exception as e:
+            logger.error(f"Ошибка удаления документов категории {category} из индекса: {str(e)}")
+            return False
+    
+    def index_search_documents(self, category: str, items: Dict[str, Dict[str, Any]]) -> bool:
+        """
+        Перестроение документов категории в полнотекстовом индексе.
+        Документы живут столько же, сколько данные элементов в кэше.
+        """
+        if not self._ensure_search_index():
+            return False
+        
+        # Удаляем документы предыдущего сбора, чтобы в индексе не оставались исчезнувшие элементы
+        self._delete_search_documents(category)
+        
+        try:
+            pipe = self.redis_client.pipeline(transaction=False)
+            for title, item_data in items.items():
+                content = " ".join(
+                    f"{section.get('title', '')} {section.get('content', '')}"
+                    for section in item_data.get("sections") or []
+                )
+                key = search_doc_key(category, title)
+                pipe.hset(key, mapping={
+                    "title": title,
+                    "description": item_data.get("description") or "",
+                    "content": content,
+                    "categories": category,
+                })
+                if self.ttl > 0:
+                    pipe.expire(key, self.ttl)
+            pipe.execute()
+            return True
+        except Exception as e:
+            logger.error(f"Ошибка индексации категории {category}: {str(e)}")
+            return False
+    
+    def search_index(self, query: str, categories: Optional[List[str]] = None,
+                     limit: int = 100) -> Optional[List[Tuple[str, str]]]:
+        """
+        Поиск элементов через RediSearch.
+        Возвращает пары (название, категория) или None, если индекс недоступен.
+        """
+        if not self.use_redis:
+            return None
+        
+        search_query = build_search_index_query(query, categories)
+        if not search_query:
+            return []
+        
+        try:
+            result = self.redis_client.ft(SEARCH_INDEX_NAME).search(
+                Query(search_query).no_content().paging(0, limit)
+            )
+        except Exception as e:
+            logger.debug(f"Поиск через RediSearch недоступен: {str(e)}")
+            return None
+        
+        return [parse_search_doc_key(doc.id) for doc in result.docs]
+    
+    def get_search_results(self, query: str, categories: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """Получение результатов поиска из кэша"""
+        return self.get(search_results_key(query, categories)) or []
+
+class AsyncRedisCache:
+    """
+    Асинхронный доступ к кэшу для обработчиков запросов.
+    Использует redis.asyncio с общим пулом соединений, а локальный и файловый кэш
+    берет у синхронного RedisCache. Обращения к диску выполняются в пуле потоков,
+    чтобы не блокировать цикл событий.
+    """
+    
+    def __init__(self, cache: RedisCache):
+        """Инициализация поверх синхронного кэша"""
+        self.cache = cache
+        self.redis_client = None
+    
+    @property
+    def use_redis(self) -> bool:
+        """Доступен ли Redis"""
+        return self.cache.use_redis and self.redis_client is not None
+    
+    async def initialize(self):
+        """Создание пула соединений с Redis"""
+        if self.redis_client or not self.cache.use_redis:
+            return
+        
+        # Блокирующий пул: при исчерпании соединений запрос ждет свободное,
+        # а не падает с "Too many connections"
+        pool = redis.asyncio.BlockingConnectionPool.from_url(
+            settings.REDIS_URL,
+            max_connections=settings.REDIS_POOL_SIZE,
+            timeout=5,  # Ожидание свободного соединения из пула
+            socket_timeout=5,
+            socket_connect_timeout=5
+        )
+        self.redis_client = redis.asyncio.Redis.from_pool(pool)
+        logger.info(f"Инициализирован асинхронный пул Redis: {self.cache.redis_host}:{self.cache.redis_port}")
+    
+    async def close(self):
+        """Закрытие пула соединений с Redis"""
+        if self.redis_client:
+            await self.redis_client.aclose()
+            self.redis_client = None
+    
+    async def ping(self) -> bool:
+        """Проверка подключения к Redis"""
+        if not self.use_redis:
+            return False
+        
+        try:
+            return await self.redis_client.ping()
+        except Exception as e:
+            logger.error(f"Ошибка подключения к Redis: {str(e)}")
+            return False
+    
+    async def get(self, key: str) -> Any:
+        """Получение данных из кэша"""
+        value = self.cache._local_get(key)
+        if value is not None:
+            return value
+        
+        if self.use_redis:
+            try:
+                data = await self.redis_client.get(key)
+                if data:
+                    self.cache._local_set(key, data)
+                    return decode_value(data)
+            except Exception as e:
+                logger.error(f"Ошибка получения данных из Redis: {str(e)}")
+        
+        return await anyio.to_thread.run_sync(self.cache._get_fallback, key)
+    
+    async def set(self, key: str, value: Any, ttl: Optional[int] = None) -> bool:
+        """Сохранение данных в кэш"""
+        if ttl is None:
+            ttl = self.cache.ttl
+        
+        success = False
+        payload = encode_value(value)
+        self.cache._local_set(key, payload, ttl)
+        
+        if self.use_redis:
+            try:
+                if ttl > 0:
+                    success = await self.redis_client.setex(key, ttl, payload)
+                else:
+                    success = await self.redis_client.set(key, payload)
+            except Exception as e:
+                logger.error(f"Ошибка сохранения данных в Redis: {str(e)}")
+        
+        if not success:
+            success = await anyio.to_thread.run_sync(self.cache._set_file, key, payload)
+        
+        return bool(success)
+    
+    async def mget_many(self, keys: List[str]) -> List[Any]:
+        """Пакетное получение данных из кэша за один запрос к Redis"""
+        values = [self.cache._local_get(key) for key in keys]
+        missing = [index for index, value in enumerate(values) if value is None]
+        if not missing:
+            return values
+        
+        if self.use_redis:
+            try:
+                blobs = await self.redis_client.mget([keys[i] for i in missing])
+                for index, blob, value in zip(missing, blobs, decode_many(blobs)):
+                    if blob:
+                        self.cache._local_set(keys[index], blob)
+                        values[index] = value
+            except Exception as e:
+                logger.error(f"Ошибка пакетного получения данных из Redis: {str(e)}")
+        
+        # Недостающие значения читаем из файлового кэша за один переход в пул потоков
+        missing = [index for index in missing if values[index] is None]
+        if missing:
+            found = await anyio.to_thread.run_sync(self.cache._get_fallback_many, [keys[i] for i in missing])
+            for index, value in zip(missing, found):
+                values[index] = value
+        
+        return values
+    
+    async def set_all_categories(self, categories: Dict[str, Any]) -> bool:
+        """Сохранение всех категорий в кэш"""
+        return await self.set(ALL_CATEGORIES_KEY, categories)
+    
+    async def get_all_categories(self) -> Dict[str, Any]:
+        """Получение всех категорий из кэша"""
+        return await self.get(ALL_CATEGORIES_KEY) or {}
+    
+    async def get_category_data(self, category: str) -> List[Dict[str, Any]]:
+        """Получение данных категории из кэша"""
+        return await self.get(category_key(category)) or []
+    
+    async def get_category_json(self, category: str) -> Dict[str, Any]:
+        """Получение готового JSON-ответа категории из кэша"""
+        return await self.get(category_json_key(category)) or {}
+    
+    async def get_category_page(self, category: str, offset: int,
+                                limit: int) -> Optional[Tuple[int, List[Dict[str, Any]]]]:
+        """
+        Получение страницы элементов категории по индексу названий без загрузки всей категории.
+        Возвращает (общее количество, элементы) или None, если индекс недоступен.
+        """
+        if not self.use_redis or limit <= 0:
+            return None
+        
+        key = category_index_key(category)
+        try:
+            pipe = self.redis_client.pipeline(transaction=False)
+            pipe.llen(key)
+            pipe.lrange(key, offset, offset + limit - 1)
+            total, titles = await pipe.execute()
+            if not total:
+                return None
+            if not titles:
+                return total, []
+            
+            raw_items = await self.redis_client.mget([item_key(title.decode("utf-8")) for title in titles])
+        except Exception as e:
+            logger.error(f"Ошибка получения индекса категории {category} из Redis: {str(e)}")
+            return None
+        
+        # Если часть элементов уже вытеснена из кэша, пусть вызывающий код загрузит категорию целиком
+        if any(raw is None for raw in raw_items):
+            return None
+        
+        return total, decode_many(raw_items)
+    
+    async def get_search_corpus(self, category: str) -> List[Tuple[str, str]]:
+        """Получение подготовленного текста для поиска по категории"""
+        return await self.get(search_corpus_key(category)) or []
+    
+    async def which_categories_cached(self, categories: List[str]) -> List[str]:
+        """Список категорий, данные которых есть в кэше"""
+        if self.use_redis:
+            try:
+                # Проверяем все ключи одним pipeline вместо GET на каждую категорию
+                pipe = self.redis_client.pipeline(transaction=False)
+                for category in categories:
+                    pipe.exists(category_key(category))
+                flags = await pipe.execute()
+                return [category for category, flag in zip(categories, flags) if flag]
+            except Exception as e:
+                logger.error(f"Ошибка проверки категорий в Redis: {str(e)}")
+        
+        return await anyio.to_thread.run_sync(self.cache._which_categories_in_files, categories)
+    
+    async def set_item_data(self, title: str, data: Dict[str, Any]) -> bool:
+        """Сохранение данных элемента в кэш"""
+        return await self.set(item_key(title), data)
+    
+    async def get_item_data(self, title: str) -> Dict[str, Any]:
+        """Получение данных элемента из кэша"""
+        return await self.get(item_key(title)) or {}
+    
+    async def get_items_data(self, titles: List[str]) -> List[Dict[str, Any]]:
+        """Получение данных нескольких элементов из кэша одним запросом"""
+        return [item or {} for item in await self.mget_many([item_key(title) for title in titles])]
+    
+    async def get_item_category(self, title: str) -> Optional[str]:
+        """Получение категории элемента по индексу"""
+        if self.use_redis:
+            try:
+                category = await self.redis_client.hget(TITLE_INDEX_KEY, title)
+                return category.decode("utf-8") if category else None
+            except Exception as e:
+                logger.error(f"Ошибка получения индекса элементов из Redis: {str(e)}")
+        
+        return (await self.get(TITLE_INDEX_KEY) or {}).get(title)
+    
+    async def search_index(self, query: str, categories: Optional[List[str]] = None,
+                           limit: int = 100) -> Optional[List[Tuple[str, str]]]:
+        """
+        Поиск элементов через RediSearch.
+        Возвращает пары (название, категория) или None, если индекс недоступен.
+        """
+        if not self.use_redis:
+            return None
+        
+        search_query = build_search_index_query(query, categories)
+        if not search_query:
+            return []
+        
+        try:
+            result = await self.redis_client.ft(SEARCH_INDEX_NAME).search(
+                Query(search_query).no_content().paging(0, limit)
+            )
+        except Exception as e:
+            logger.debug(f"Поиск через RediSearch недоступен: {str(e)}")
+            return None
+        
+        return [parse_search_doc_key(doc.id) for doc in result.docs]
+    
+    async def set_search_results(self, query: str, results: List[Dict[str, Any]],
+                                 categories: Optional[List[str]] = None) -> bool:
+        """Сохранение результатов поиска в кэш с регистрацией для сброса при обновлении категорий"""
+        key = search_results_key(query, categories)
+        # Для поиска используем меньший TTL
+        success = await self.set(key, results, ttl=settings.SEARCH_CACHE_TTL)
+        
+        if self.use_redis:
+            try:
+                pipe = self.redis_client.pipeline(transaction=False)
+                for tag in search_results_tags(categories):
+                    pipe.sadd(tag, key)
+                    pipe.expire(tag, settings.SEARCH_CACHE_TTL)
+                await pipe.execute()
+            except Exception as e:
+                logger.error(f"Ошибка регистрации результатов поиска в Redis: {str(e)}")
+        
+        return success
+    
+    async def get_search_results(self, query: str, categories: Optional[List[str]] = None) -> List[Dict[str, Any]]:
         """Получение результатов поиска из кэша"""
-        return self.get(f"search:{query}") or []
+        return await self.get(search_results_key(query, categories)) or []
 
 # Создаем экземпляр RedisCache для использования в приложении
-redis_cache = RedisCache()
\ No newline at end of file
+redis_cache = RedisCache()
+redis_cache_async = AsyncRedisCache(redis_cache)
+
+def get_redis_sync() -> RedisCache:
+    """Зависимость FastAPI: синхронный кэш для фоновых задач и утилит"""
+    return redis_cache
+
+async def get_redis_async() -> AsyncRedisCache:
+    """Зависимость FastAPI: асинхронный кэш для обработчиков запросов"""
+    await redis_cache_async.initialize()
+    return redis_cache_async
\ No newline at end of file
@@ -15,11 +15,15 @@ Uses fandom.py and MediaWiki API for efficient data retrieval.
 
 import fandom
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import logging
 import re
-import json
+import orjson
+from selectolax.parser import HTMLParser
 import os
-from typing import List, Dict, Any, Optional, Union, Set
+from typing import List, Dict, Any, Optional, Union, Set, Tuple, Iterator
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from pathlib import Path
 
@@ -31,6 +35,20 @@ LANGUAGE = settings.WIKI_LANGUAGE
 API_URL: Optional[str] = None
 OUTPUT_DIR = settings.TEMP_DIR
 CATEGORIES = settings.CATEGORIES
+BATCH_SIZE = 50  # MediaWiki limit of titles per query
+SCRAPE_WORKERS = 8  # Parallel batch requests; 429/Retry-After is handled by the session retries
+# Per-page limits of the bundle lists
+MAX_PAGE_CATEGORIES = 50
+MAX_PAGE_IMAGES = 20
+MAX_PAGE_LINKS = 50
+
+# Patterns used by clean_description
+_RE_SUBPAGES = re.compile(r'^Sub-Pages:[A-Za-z0-9]+\s*')
+_RE_EXPAND = re.compile(r'This section requires expanding\. Click here to add more\.📝')
+_RE_CLEANUP = re.compile(r'This article requires cleanup\.')
+_RE_HTML = re.compile(r'<[^>]+>')
+_RE_NL = re.compile(r'\n+')
+_RE_WS = re.compile(r'\s+')
 
 # Setup logging
 def setup_logging(level=logging.INFO) -> logging.Logger:
@@ -54,6 +72,24 @@ def setup_logging(level=logging.INFO) -> logging.Logger:
 # Create logger
 logger = setup_logging(level=logging.INFO)
 
+def create_session() -> requests.Session:
+    """
+    Create an HTTP session with a connection pool and retries,
+    so that TCP/TLS connections to the wiki are reused between requests.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=16,
+        pool_maxsize=64,
+        max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504])
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+# Shared HTTP session for all wiki requests
+SESSION = create_session()
+
 def initialize_wiki(slug: str = WIKI_SLUG, lang: str = LANGUAGE) -> None:
     """
     Initialize fandom.py and set up the API URL.
@@ -65,7 +101,7 @@ def initialize_wiki(slug: str = WIKI_SLUG, lang: str = LANGUAGE) -> None:
     
     # Check API availability
     try:
-        resp = requests.get(API_URL, params={"action": "query", "meta": "siteinfo", "format": "json"})
+        resp = SESSION.get(API_URL, params={"action": "query", "meta": "siteinfo", "format": "json"}, timeout=10)
         resp.raise_for_status()
     except Exception as e:
         logger.error(f"Error accessing API {API_URL}: {e}")
@@ -79,37 +115,31 @@ def fetch_category_members(category: str, limit: int = 500) -> List[Dict]:
     Handles pagination for large sets of data.
     """
     members: List[Dict] = []
-    session = requests.Session()
-    session.timeout = (5, 30)  # (connect timeout, read timeout)
-    cmcontinue = None
+    timeout = (5, 30)  # (connect timeout, read timeout)
+    params = {
+        "action": "query",
+        "format": "json",
+        "list": "categorymembers",
+        "cmtitle": f"Category:{category}",
+        "cmlimit": limit,
+        "cmnamespace": "0"  # Articles only
+    }
     
     logger.info(f"Loading members from category: {category}")
 
     while True:
-        params = {
-            "action": "query",
-            "format": "json",
-            "list": "categorymembers",
-            "cmtitle": f"Category:{category}",
-            "cmlimit": limit,
-            "cmnamespace": "0"  # Articles only
-        }
-        
-        if cmcontinue:
-            params["cmcontinue"] = cmcontinue
-
         try:
-            resp = session.get(API_URL, params=params, timeout=session.timeout)
+            resp = SESSION.get(API_URL, params=params, timeout=timeout)
             resp.raise_for_status()
-            data = resp.json()
+            data = orjson.loads(resp.content)
 
-            for p in data.get("query", {}).get("categorymembers", []):
-                members.append(p)
+            members.extend(data.get("query", {}).get("categorymembers", ()))
             
-            cont = data.get("continue", {})
-            cmcontinue = cont.get("cmcontinue")
-            if not cmcontinue:
+            # Pass the continuation parameters as returned by the API
+            cont = data.get("continue") or {}
+            if not cont.get("cmcontinue"):
                 break
+            params.update(cont)
         
         except requests.exceptions.Timeout:
             logger.error("Timeout while loading category members")
@@ -124,7 +154,193 @@ def fetch_category_members(category: str, limit: int = 500) -> List[Dict]:
     logger.info(f"Loaded {len(members)} articles from category {category}")
     return members
 
-def get_page_metadata(title: str) -> Dict[str, Any]:
+def get_fandom_page(title: str):
+    """
+    Get a page through fandom-py. Not cached: get_page_metadata fetches the
+    page once and passes it to the extract stages, so a rescrape always
+    sees the current content.
+    """
+    return fandom.page(title)
+
+def fetch_page_bundle(title: str) -> Dict[str, Any]:
+    """
+    Get extract, categories, images and links of a page with a single
+    MediaWiki API request instead of one request per property.
+    """
+    bundle = {
+        "extract": None,
+        "categories": [],
+        "image_titles": [],
+        "related_pages": []
+    }
+    
+    params = {
+        'action': 'query',
+        'format': 'json',
+        'titles': title,
+        'prop': 'extracts|categories|images|links',
+        'exintro': 0,
+        'explaintext': 1,
+        'cllimit': MAX_PAGE_CATEGORIES,
+        'imlimit': MAX_PAGE_IMAGES,
+        'pllimit': MAX_PAGE_LINKS,
+        'formatversion': 2,
+        'redirects': 1
+    }
+    response = SESSION.get(API_URL, params=params, timeout=10)
+    data = orjson.loads(response.content)
+    
+    pages = data.get('query', {}).get('pages')
+    if not pages:
+        return bundle
+    
+    page = pages[0]
+    bundle["extract"] = page.get('extract')
+    bundle["categories"] = [cat['title'].replace('Category:', '') for cat in page.get('categories', [])]
+    bundle["image_titles"] = [img['title'] for img in page.get('images', []) if img['title'].startswith('File:')]
+    bundle["related_pages"] = [link['title'] for link in page.get('links', [])]
+    return bundle
+
+def fetch_page_images(title: str, image_titles: List[str]) -> List[Dict[str, str]]:
+    """
+    Get URLs of all page images with a single request (generator=images)
+    instead of one imageinfo request per image.
+    """
+    params = {
+        'action': 'query',
+        'format': 'json',
+        'titles': title,
+        'generator': 'images',
+        'gimlimit': MAX_PAGE_IMAGES,
+        'prop': 'imageinfo',
+        'iiprop': 'url',
+        'formatversion': 2,
+        'redirects': 1
+    }
+    response = SESSION.get(API_URL, params=params, timeout=10)
+    data = orjson.loads(response.content)
+    
+    urls = {}
+    for page in data.get('query', {}).get('pages', []):
+        if page.get('imageinfo'):
+            urls[page['title']] = page['imageinfo'][0]['url']
+    
+    # Keep the order in which images appear on the page
+    return [
+        {"title": img_title.replace('File:', ''), "url": urls[img_title]}
+        for img_title in image_titles if img_title in urls
+    ]
+
+def chunks(items: List[Any], size: int):
+    """Split a list into consecutive chunks of at most size elements."""
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+def fetch_many_bundles(titles: List[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    Get page bundles (see fetch_page_bundle) for up to BATCH_SIZE titles with
+    one multi-title query. Follows 'continue' until all properties are
+    returned, since list limits are shared by all pages of the query.
+    Each page keeps the same list caps as fetch_page_bundle.
+    
+    Multi-title extracts are only supported for the intro section, so the
+    returned extract is the article intro.
+    
+    Returns a dictionary of requested titles and their bundles.
+    """
+    params = {
+        'action': 'query',
+        'format': 'json',
+        'titles': '|'.join(titles),
+        'prop': 'extracts|categories|images|links|info',
+        'exintro': 1,
+        'explaintext': 1,
+        'exlimit': 'max',
+        'cllimit': 'max',
+        'imlimit': 'max',
+        'pllimit': 'max',
+        'formatversion': 2,
+        'redirects': 1
+    }
+    
+    bundles = {}
+    aliases = {}
+    cont = {}
+    while True:
+        response = SESSION.get(API_URL, params={**params, **cont}, timeout=30)
+        data = orjson.loads(response.content)
+        query = data.get('query', {})
+        
+        # Titles may be normalized or redirected by the API
+        for item in query.get('normalized', []) + query.get('redirects', []):
+            aliases[item['from']] = item['to']
+        
+        for page in query.get('pages', []):
+            if page.get('missing'):
+                continue
+            bundle = bundles.setdefault(page['title'], {
+                "id": page.get('pageid'),
+                "extract": None,
+                "categories": [],
+                "image_titles": [],
+                "related_pages": []
+            })
+            if page.get('extract'):
+                bundle["extract"] = page['extract']
+            bundle["categories"].extend(cat['title'].replace('Category:', '') for cat in page.get('categories', []))
+            bundle["image_titles"].extend(img['title'] for img in page.get('images', []) if img['title'].startswith('File:'))
+            bundle["related_pages"].extend(link['title'] for link in page.get('links', []))
+            del bundle["categories"][MAX_PAGE_CATEGORIES:]
+            del bundle["image_titles"][MAX_PAGE_IMAGES:]
+            del bundle["related_pages"][MAX_PAGE_LINKS:]
+        
+        cont = data.get('continue')
+        if not cont:
+            break
+    
+    results = {}
+    for title in titles:
+        resolved = title
+        while resolved in aliases and aliases[resolved] != resolved:
+            resolved = aliases[resolved]
+        if resolved in bundles:
+            results[title] = bundles[resolved]
+    return results
+
+def fetch_image_urls(image_titles: List[str]) -> Dict[str, str]:
+    """
+    Get URLs for a list of 'File:' titles, BATCH_SIZE titles per request.
+    
+    Returns a dictionary of file titles and their URLs.
+    """
+    urls = {}
+    for chunk in chunks(image_titles, BATCH_SIZE):
+        params = {
+            'action': 'query',
+            'format': 'json',
+            'titles': '|'.join(chunk),
+            'prop': 'imageinfo',
+            'iiprop': 'url',
+            'formatversion': 2
+        }
+        response = SESSION.get(API_URL, params=params, timeout=30)
+        data = orjson.loads(response.content)
+        
+        for page in data.get('query', {}).get('pages', []):
+            if page.get('imageinfo'):
+                urls[page['title']] = page['imageinfo'][0]['url']
+    return urls
+
+def fetch_batch(titles: List[str]) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, str]]:
+    """Get page bundles and image URLs for one batch of titles."""
+    bundles = fetch_many_bundles(titles)
+    image_titles = list(dict.fromkeys(
+        img_title for bundle in bundles.values() for img_title in bundle["image_titles"]
+    ))
+    return bundles, fetch_image_urls(image_titles)
+
+def get_page_metadata(title: str, bundle: Optional[Dict[str, Any]] = None,
+                      image_urls: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
     """
     Get comprehensive metadata for a wiki page, including:
     - Basic info (title, id, url)
@@ -133,6 +349,10 @@ def get_page_metadata(title: str) -> Dict[str, Any]:
     - Images
     - Related pages
     
+    If the page bundle and image URLs were already fetched in bulk
+    (see fetch_many_bundles and fetch_image_urls), pass them to skip
+    the per-page requests.
+    
     Returns a dictionary with all available metadata.
     """
     metadata = {
@@ -147,13 +367,24 @@ def get_page_metadata(title: str) -> Dict[str, Any]:
     }
     
     try:
-        # Method 1: Get detailed page info through fandom-py
+        # Get extract, categories, images and links in one request
         try:
-            page = fandom.page(title)
+            if bundle is None:
+                bundle = fetch_page_bundle(title)
+            metadata["categories"] = bundle["categories"]
+            metadata["related_pages"] = bundle["related_pages"]
+            if bundle.get("id") is not None:
+                metadata["id"] = bundle["id"]
+        except Exception as e:
+            logger.debug(f"Error getting page properties: {str(e)}")
+        
+        # Get detailed page info through fandom-py
+        try:
+            page = get_fandom_page(title)
             metadata["id"] = page.pageid
             
             # Get description
-            metadata["description"] = get_page_extract(title)
+            metadata["description"] = get_page_extract(title, api_extract=bundle["extract"] if bundle else None, page=page)
             
             # Get infobox and sections
             content = page.content
@@ -180,89 +411,18 @@ def get_page_metadata(title: str) -> Dict[str, Any]:
         except Exception as e:
             logger.debug(f"Error getting page through fandom-py: {str(e)}")
         
-        # Method 2: Get categories
-        try:
-            params = {
-                'action': 'query',
-                'format': 'json',
-                'titles': title,
-                'prop': 'categories',
-                'cllimit': 50,
-                'formatversion': 2
-            }
-            response = requests.get(API_URL, params=params, timeout=10)
-            data = response.json()
-            
-            if 'query' in data and 'pages' in data['query'] and data['query']['pages']:
-                page = data['query']['pages'][0]
-                if 'categories' in page:
-                    metadata["categories"] = [cat['title'].replace('Category:', '') 
-                                            for cat in page['categories']]
-        except Exception as e:
-            logger.debug(f"Error getting categories: {str(e)}")
-        
-        # Method 3: Get images
-        try:
-            params = {
-                'action': 'query',
-                'format': 'json',
-                'titles': title,
-                'prop': 'images',
-                'imlimit': 20,
-                'formatversion': 2
-            }
-            response = requests.get(API_URL, params=params, timeout=10)
-            data = response.json()
-            
-            if 'query' in data and 'pages' in data['query'] and data['query']['pages']:
-                page = data['query']['pages'][0]
-                if 'images' in page:
-                    for img in page['images']:
-                        img_title = img['title']
-                        if img_title.startswith('File:'):
-                            # Get image URL
-                            try:
-                                params = {
-                                    'action': 'query',
-                                    'format': 'json',
-                                    'titles': img_title,
-                                    'prop': 'imageinfo',
-                                    'iiprop': 'url',
-                                    'formatversion': 2
-                                }
-                                img_response = requests.get(API_URL, params=params, timeout=10)
-                                img_data = img_response.json()
-                                if ('query' in img_data and 'pages' in img_data['query'] and 
-                                    img_data['query']['pages'] and 'imageinfo' in img_data['query']['pages'][0]):
-                                    img_url = img_data['query']['pages'][0]['imageinfo'][0]['url']
-                                    metadata["images"].append({
-                                        "title": img_title.replace('File:', ''),
-                                        "url": img_url
-                                    })
-                            except Exception as e:
-                                logger.debug(f"Error getting image URL: {str(e)}")
-        except Exception as e:
-            logger.debug(f"Error getting images: {str(e)}")
-            
-        # Method 4: Get links
-        try:
-            params = {
-                'action': 'query',
-                'format': 'json',
-                'titles': title,
-                'prop': 'links',
-                'pllimit': 50,
-                'formatversion': 2
-            }
-            response = requests.get(API_URL, params=params, timeout=10)
-            data = response.json()
-            
-            if 'query' in data and 'pages' in data['query'] and data['query']['pages']:
-                page = data['query']['pages'][0]
-                if 'links' in page:
-                    metadata["related_pages"] = [link['title'] for link in page['links']]
-        except Exception as e:
-            logger.debug(f"Error getting links: {str(e)}")
+        # Get URLs of all images in one request
+        if bundle and bundle["image_titles"]:
+            try:
+                if image_urls is None:
+                    metadata["images"] = fetch_page_images(title, bundle["image_titles"])
+                else:
+                    metadata["images"] = [
+                        {"title": img_title.replace('File:', ''), "url": image_urls[img_title]}
+                        for img_title in bundle["image_titles"] if img_title in image_urls
+                    ]
+            except Exception as e:
+                logger.debug(f"Error getting images: {str(e)}")
             
         return metadata
     
@@ -270,78 +430,77 @@ def get_page_metadata(title: str) -> Dict[str, Any]:
         logger.error(f"Error getting metadata for '{title}': {str(e)}")
         return metadata
 
-def get_page_extract(title: str) -> Optional[str]:
-    """
-    Get comprehensive page description using multiple methods.
-    Returns None if no valid description is found.
-    """
+def _try_fandom_py(title: str, page: Any = None) -> Optional[str]:
+    """Build a description from the page summary and key sections through fandom-py."""
     try:
-        # Method 1: Try getting the page directly through fandom-py
-        try:
-            page = fandom.page(title)
+        page = page or get_fandom_page(title)
+        
+        description = None
+        
+        # If page has an infobox, combine it with summary for comprehensive description
+        content = page.content
+        if isinstance(content, dict):
+            description_parts = []
             
-            description = None
+            # Add summary if available
+            if page.summary and not page.summary.startswith('Sub-Pages'):
+                description_parts.append(page.summary)
             
-            # If page has an infobox, combine it with summary for comprehensive description
-            content = page.content
-            if isinstance(content, dict):
-                description_parts = []
-                
-                # Add summary if available
-                if page.summary and not page.summary.startswith('Sub-Pages'):
-                    description_parts.append(page.summary)
-                
-                # Add general content if available
-                if content.get('content') and content['content'].strip():
-                    description_parts.append(content['content'].strip())
-                
-                # Look for key sections
-                important_sections = ['Description', 'Biography', 'Background', 'Personality', 'Appearance', 'History']
-                
-                if content.get('sections'):
-                    for section in content['sections']:
-                        if section.get('title') and section['title'] in important_sections and section.get('content'):
-                            section_text = f"{section['content'].strip()}"
-                            description_parts.append(section_text)
-                
-                # Combine all parts
-                if description_parts:
-                    description = ' '.join(description_parts)
-                    
-                    # Clean up the description
-                    description = clean_description(description)
-                    
-                    # Limit to 5 sentences if too long
-                    sentences = description.split('. ')
-                    if len(sentences) > 5:
-                        description = '. '.join(sentences[:5]) + '.'
-                    
-                    return description
-                
-                # If no complete description built yet, try individual parts
-                if page.summary and not page.summary.startswith('Sub-Pages'):
-                    return clean_description(page.summary)
+            # Add general content if available
+            if content.get('content') and content['content'].strip():
+                description_parts.append(content['content'].strip())
+            
+            # Look for key sections
+            important_sections = ['Description', 'Biography', 'Background', 'Personality', 'Appearance', 'History']
+            
+            if content.get('sections'):
+                for section in content['sections']:
+                    if section.get('title') and section['title'] in important_sections and section.get('content'):
+                        section_text = f"{section['content'].strip()}"
+                        description_parts.append(section_text)
+            
+            # Combine all parts
+            if description_parts:
+                description = ' '.join(description_parts)
                 
-                if content.get('content') and content['content'].strip():
-                    return clean_description(content['content'].strip())
+                # Clean up the description
+                description = clean_description(description)
                 
-                # Try first section content
-                if content.get('sections'):
-                    for section in content['sections']:
-                        if section.get('content'):
-                            text = section['content'].strip()
-                            if text:
-                                return clean_description(text)
+                # Limit to 5 sentences if too long
+                sentences = description.split('. ')
+                if len(sentences) > 5:
+                    description = '. '.join(sentences[:5]) + '.'
                 
-                # Try infobox if exists
-                if content.get('infobox'):
-                    text = content['infobox'].strip()
-                    if text:
-                        return clean_description(text)
-        except Exception as e:
-            pass
+                return description
+            
+            # If no complete description built yet, try individual parts
+            if page.summary and not page.summary.startswith('Sub-Pages'):
+                return clean_description(page.summary)
+            
+            if content.get('content') and content['content'].strip():
+                return clean_description(content['content'].strip())
+            
+            # Try first section content
+            if content.get('sections'):
+                for section in content['sections']:
+                    if section.get('content'):
+                        text = section['content'].strip()
+                        if text:
+                            return clean_description(text)
+            
+            # Try infobox if exists
+            if content.get('infobox'):
+                text = content['infobox'].strip()
+                if text:
+                    return clean_description(text)
+    except Exception:
+        pass
+    return None
 
-        # Method 2: Try API extract as fallback
+def _try_api_extract(title: str, api_extract: Optional[str] = None) -> Optional[str]:
+    """Get a description from the API plain text extract."""
+    extract = api_extract
+    if extract is None:
         params = {
             'action': 'query',
             'format': 'json',
@@ -351,53 +510,75 @@ def get_page_extract(title: str) -> Optional[str]:
             'explaintext': 1,
             'formatversion': 2
         }
-        response = requests.get(API_URL, params=params, timeout=10)
-        data = response.json()
+        response = SESSION.get(API_URL, params=params, timeout=10)
+        data = orjson.loads(response.content)
         
-        if 'query' in data and 'pages' in data['query']:
-            pages = data['query']['pages']
-            if pages and 'extract' in pages[0]:
-                extract = pages[0]['extract']
-                if extract:
-                    extract = clean_description(extract)
-                    
-                    # Limit to 5 sentences if too long
-                    sentences = extract.split('. ')
-                    if len(sentences) > 5:
-                        extract = '. '.join(sentences[:5]) + '.'
-                    return extract
+        pages = data.get('query', {}).get('pages')
+        if pages:
+            extract = pages[0].get('extract')
+    
+    if not extract:
+        return None
+    
+    extract = clean_description(extract)
+    
+    # Limit to 5 sentences if too long
+    sentences = extract.split('. ')
+    if len(sentences) > 5:
+        extract = '. '.join(sentences[:5]) + '.'
+    return extract
 
-        # Method 3: Try search as last resort
+def _try_search(title: str, page: Any = None) -> Optional[str]:
+    """Get a description from the summary of an exact search match."""
+    try:
         search_results = fandom.search(title, results=1)
-        if search_results and len(search_results) > 0:
-            result_title = search_results[0][0]
-            if result_title == title:  # Only use if exact match
-                try:
-                    page = fandom.page(result_title)
-                    if page.summary:
-                        return clean_description(page.summary)
-                except:
-                    pass
+        if search_results and search_results[0][0] == title:  # Only use if exact match
+            page = page or get_fandom_page(title)
+            if page.summary:
+                return clean_description(page.summary)
+    except Exception:
+        pass
+    return None
 
-        # Method 4: Try parsing the HTML directly as last resort
-        try:
-            session = requests.Session()
-            resp = session.get(f"https://cyberpunk.fandom.com/wiki/{title.replace(' ', '_')}")
-            if resp.status_code == 200:
-                text = resp.text
-                
-                # Try to extract the first paragraph after article-header
-                match = re.search(r'<div class="mw-parser-output">(.*?)<p>(.*?)</p>', text, re.DOTALL)
-                if match and match.group(2):
-                    # Clean HTML tags
-                    paragraph = re.sub(r'<[^>]+>', '', match.group(2))
-                    if paragraph.strip():
-                        return clean_description(paragraph.strip())
-        except:
-            pass
-
-        return None
+def _try_html(title: str) -> Optional[str]:
+    """Get a description from the first paragraph of the rendered article."""
+    try:
+        resp = SESSION.get(f"https://cyberpunk.fandom.com/wiki/{title.replace(' ', '_')}", timeout=10)
+        if resp.status_code == 200:
+            paragraph = HTMLParser(resp.content).css_first('div.mw-parser-output > p')
+            if paragraph:
+                text = paragraph.text().strip()
+                if text:
+                    return clean_description(text)
+    except Exception:
+        pass
+    return None
 
+def get_page_extract(title: str, api_extract: Optional[str] = None, page: Any = None) -> Optional[str]:
+    """
+    Get comprehensive page description using multiple methods, returning
+    the result of the first one that succeeds.
+    If the API extract or the fandom-py page were already fetched
+    (see fetch_page_bundle), pass them as api_extract and page to avoid
+    requesting them again.
+    Returns None if no valid description is found.
+    """
+    try:
+        # Method 1: Try getting the page directly through fandom-py
+        if (extract := _try_fandom_py(title, page)):
+            return extract
+        
+        # Method 2: Try API extract as fallback
+        if (extract := _try_api_extract(title, api_extract)):
+            return extract
+        
+        # Method 3: Try search as last resort
+        if (extract := _try_search(title, page)):
+            return extract
+        
+        # Method 4: Try parsing the HTML directly as last resort
+        return _try_html(title)
+    
     except Exception as e:
         logger.debug(f"Error getting extract for '{title}': {str(e)}")
         return None
@@ -410,42 +591,42 @@ def clean_description(text: str) -> str:
         return text
         
     # Remove common prefixes
-    text = re.sub(r'^Sub-Pages:[A-Za-z0-9]+\s*', '', text)
+    text = _RE_SUBPAGES.sub('', text)
     
     # Remove "This section requires expanding" notes
-    text = re.sub(r'This section requires expanding\. Click here to add more\.📝', '', text)
+    text = _RE_EXPAND.sub('', text)
     
     # Remove "This article requires cleanup" notes
-    text = re.sub(r'This article requires cleanup\.', '', text)
+    text = _RE_CLEANUP.sub('', text)
     
     # Remove any HTML tags
-    text = re.sub(r'<[^>]+>', '', text)
+    text = _RE_HTML.sub('', text)
     
     # Fix newlines and whitespace
-    text = re.sub(r'\n+', ' ', text)
-    text = re.sub(r'\s+', ' ', text)
+    text = _RE_NL.sub(' ', text)
+    text = _RE_WS.sub(' ', text)
     
-    # Remove duplicated sentences
+    # Remove duplicated sentences (case insensitive comparison)
     sentences = text.split('. ')
+    seen = set()
     unique_sentences = []
     for sentence in sentences:
-        # Add sentence only if not already in the list (case insensitive comparison)
-        if not any(sentence.lower() == s.lower() for s in unique_sentences):
+        key = sentence.lower()
+        if key not in seen:
+            seen.add(key)
             unique_sentences.append(sentence)
     
     text = '. '.join(unique_sentences)
     
     return text.strip()
 
-def get_all_wiki_categories() -> List[str]:
+def iter_wiki_categories() -> Iterator[List[str]]:
     """
-    Get a list of all categories available in the wiki.
+    Iterate over all categories available in the wiki,
+    yielding category names page by page as the API returns them.
     """
-    categories = []
     acfrom = None
     
-    logger.info("Getting list of all wiki categories...")
-    
     while True:
         params = {
             "action": "query",
@@ -459,16 +640,12 @@ def get_all_wiki_categories() -> List[str]:
             params["acfrom"] = acfrom
             
         try:
-            session = requests.Session()
-            resp = session.get(API_URL, params=params, timeout=30)
+            resp = SESSION.get(API_URL, params=params, timeout=30)
             resp.raise_for_status()
-            data = resp.json()
+            data = orjson.loads(resp.content)
             
-            if 'query' in data and 'allcategories' in data['query']:
-                for cat in data['query']['allcategories']:
-                    # The category name is directly in the '*' key in format version 1
-                    if '*' in cat:
-                        categories.append(cat['*'])
+            # The category name is directly in the '*' key in format version 1
+            yield [cat['*'] for cat in data.get('query', {}).get('allcategories', ()) if '*' in cat]
                 
             if 'continue' in data and 'accontinue' in data['continue']:
                 acfrom = data['continue']['accontinue']
@@ -478,10 +655,45 @@ def get_all_wiki_categories() -> List[str]:
         except Exception as e:
             logger.error(f"Error getting category list: {str(e)}")
             break
+
+def get_all_wiki_categories() -> List[str]:
+    """
+    Get a list of all categories available in the wiki.
+    """
+    logger.info("Getting list of all wiki categories...")
+    
+    categories = []
+    for page in iter_wiki_categories():
+        categories.extend(page)
             
     logger.info(f"Found {len(categories)} categories")
     return categories
 
+def save_all_wiki_categories(filename: str) -> int:
+    """
+    Save all wiki categories to a JSONL file (one JSON string per line),
+    writing each page of categories as soon as it arrives instead of
+    collecting the whole list in memory.
+    
+    Returns the number of saved categories.
+    """
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    filepath = os.path.join(OUTPUT_DIR, filename)
+    count = 0
+    
+    logger.info("Getting list of all wiki categories...")
+    
+    try:
+        with open(filepath, 'wb') as f:
+            for page in iter_wiki_categories():
+                f.write(b''.join(orjson.dumps(name) + b'\n' for name in page))
+                count += len(page)
+        logger.info(f"Saved {count} categories to {filepath}")
+    except Exception as e:
+        logger.error(f"Error saving data to {filepath}: {e}")
+    
+    return count
+
 def scrape_category(category_name: str, limit: Optional[int] = None) -> Dict[str, Dict[str, Any]]:
     """
     Scrape all articles from a specific category and collect their metadata.
@@ -505,18 +717,33 @@ def scrape_category(category_name: str, limit: Optional[int] = None) -> Dict[str
     total = len(members)
     logger.info(f"Processing {total} articles from category '{category_name}'")
     
-    # Process each member
-    for i, member in enumerate(members, 1):
-        title = member.get("title")
-        logger.info(f"Processing article {i}/{total}: {title}")
-        
-        # Get detailed metadata
-        metadata = get_page_metadata(title)
-        results[title] = metadata
-        
-        # Show progress every 10 articles
-        if i % 10 == 0:
-            logger.info(f"Progress: {i}/{total} articles processed")
+    # Fetch page properties and image URLs for BATCH_SIZE articles per request,
+    # several batches in parallel. Only raw API requests run in the pool:
+    # fandom-py calls are not thread-safe and stay in this thread.
+    processed = 0
+    with ThreadPoolExecutor(max_workers=SCRAPE_WORKERS) as executor:
+        futures = {
+            executor.submit(fetch_batch, chunk): chunk
+            for chunk in chunks([member.get("title") for member in members], BATCH_SIZE)
+        }
+        for future in as_completed(futures):
+            chunk = futures[future]
+            try:
+                bundles, image_urls = future.result()
+            except Exception as e:
+                logger.error(f"Error fetching batch of {len(chunk)} articles: {str(e)}")
+                bundles, image_urls = {}, None
+            
+            for title in chunk:
+                # Articles missing from the batch are fetched one by one
+                metadata = get_page_metadata(title, bundles.get(title), image_urls if title in bundles else None)
+                results[title] = metadata
+            
+            processed += len(chunk)
+            logger.info(f"Progress: {processed}/{total} articles processed")
+    
+    # Keep the category order of articles
+    results = {member.get("title"): results[member.get("title")] for member in members}
     
     return results
 
@@ -528,8 +755,8 @@ def save_to_json(data: Any, filename: str) -> None:
     filepath = os.path.join(OUTPUT_DIR, filename)
     
     try:
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        with open(filepath, 'wb') as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
         logger.info(f"Data saved to {filepath}")
     except Exception as e:
         logger.error(f"Error saving data to {filepath}: {e}")
@@ -545,8 +772,7 @@ def main():
     initialize_wiki()
     
     # Get all wiki categories (for reference)
-    all_categories = get_all_wiki_categories()
-    save_to_json(all_categories, "all_categories.json")
+    save_all_wiki_categories("all_categories.jsonl")
     
     # Process each defined category
     for category_key, category_name in CATEGORIES.items():
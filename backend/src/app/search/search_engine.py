@@ -10,18 +10,35 @@
 
 from typing import List, Dict, Any, Optional, Tuple
 import asyncio
-import re
-import json
+import orjson
+import xxhash
+from sqlalchemy import text
+from cachetools import TTLCache
 import logging
 from datetime import datetime
 
-import aioredis
+import redis.asyncio as redis_async
 
 from src.core.config import settings
+from src.core.database import get_engine, get_session
+from src.app.redis.redis_cache import search_keys_tag, suggestions_index_key, normalize_text
 
 # Настройка логгера
 logger = logging.getLogger(__name__)
 
+# Веса ts_rank_cd для меток {D, C, B, A} в search_vector: заголовок (A), описание (B) и
+# содержимое (C) ранжируются в прежнем соотношении 2 : 1.5 : 1. Нормировка 32 приводит ранг к (0, 1)
+SEARCH_RANK_WEIGHTS = "{0.1, 0.5, 0.75, 1.0}"
+
+def query_cache_tag(query: str) -> str:
+    """
+    Короткий хэш запроса для ключей кэша: длина ключа не зависит от длины запроса.
+    Коллизии xxh3 для кэша не критичны - записи ограничены TTL.
+    Хэш обернут в {...} (hash tag Redis Cluster), поэтому все ключи одного запроса
+    попадают в один слот и их можно читать одним MGET.
+    """
+    return "{" + xxhash.xxh3_64_hexdigest(query.lower()) + "}"
+
 class SearchEngine:
     """
     Класс, отвечающий за поиск по wiki-контенту.
@@ -35,23 +52,137 @@ class SearchEngine:
         """
         self.max_results = settings.SEARCH_MAX_RESULTS
         self.min_query_length = settings.SEARCH_MIN_QUERY_LENGTH
-        self.categories = settings.CATEGORIES
+        self.categories = list(settings.CATEGORIES)
         self.redis = None
         self.search_cache_ttl = settings.SEARCH_CACHE_TTL
+        # Локальный кэш процесса перед Redis для повторяющихся запросов (например, при наборе текста)
+        self._local = TTLCache(maxsize=2048, ttl=min(30, self.search_cache_ttl))
+        
+        # SQL-запросы собираются один раз и только для категорий из настроек
+        self._search_sql = {category: self._build_search_sql(category) for category in self.categories}
+        self._suggest_sql = self._build_suggest_sql(self.categories)
+    
+    @staticmethod
+    def _build_search_sql(category: str) -> str:
+        """
+        SQL-запрос поиска по таблице категории.
+        Используем полнотекстовый поиск PostgreSQL по заранее вычисленному search_vector
+        (см. ensure_search_schema): поиск идет по GIN-индексу, а веса полей учитывает ts_rank_cd.
+        Выдержку строит ts_headline только для отобранных строк, поэтому content не передается клиенту.
+        """
+        return f"""
+        WITH matches AS (
+            SELECT id, title, description, content, url, image_url, metadata, q,
+                ts_rank_cd('{SEARCH_RANK_WEIGHTS}'::float4[], search_vector, q, 32) AS rank
+            FROM {category}, plainto_tsquery('russian', :query) q
+            WHERE search_vector @@ q
+            ORDER BY rank DESC
+            LIMIT :limit
+        )
+        SELECT id, title, description, url, image_url, metadata,
+            ts_headline('russian', content, q,
+                'MaxWords=25, MinWords=15, ShortWord=3, StartSel="", StopSel=""') AS excerpt
+        FROM matches
+        ORDER BY rank DESC
+        """
+    
+    @staticmethod
+    def _build_suggest_sql(categories: List[str]) -> str:
+        """
+        SQL-запрос автодополнения: один запрос по всем категориям вместо отдельного на каждую.
+        Вес A в префиксном запросе ограничивает поиск заголовками и использует GIN-индекс по search_vector.
+        """
+        return " UNION ALL ".join(
+            f"""(SELECT title FROM {category}
+                WHERE search_vector @@ to_tsquery('russian', :query || ':*A')
+                LIMIT :limit)"""
+            for category in categories
+        ) + " LIMIT :limit"
     
     async def initialize(self):
         """
         Асинхронная инициализация соединения с Redis.
+        Схема поиска в БД создается отдельно командой manage.py init_search_schema.
         """
         if not self.redis:
-            self.redis = await aioredis.from_url(settings.REDIS_URL)
+            # Клиент с пулом соединений: параллельные запросы не ждут друг друга на одном соединении,
+            # а при исчерпании пула ждут свободное соединение вместо ошибки "Too many connections"
+            pool = redis_async.BlockingConnectionPool.from_url(
+                settings.REDIS_URL,
+                decode_responses=False,
+                max_connections=settings.REDIS_POOL_SIZE,
+                timeout=5
+            )
+            self.redis = redis_async.Redis.from_pool(pool)
+    
+    async def ensure_search_schema(self):
+        """
+        Создает в таблицах категорий взвешенный столбец search_vector и GIN-индекс по нему.
+        Вектор вычисляется при записи строки, а не при каждом запросе:
+        заголовок - вес A, описание - B, содержимое - C.
+        
+        Добавление столбца перезаписывает заполненную таблицу под блокировкой ACCESS EXCLUSIVE,
+        поэтому метод не вызывается из обработки запросов, а запускается один раз
+        командой manage.py init_search_schema. Операции идемпотентны.
+        """
+        # CREATE INDEX CONCURRENTLY не блокирует запись, но не может выполняться в транзакции
+        async with get_engine().connect() as conn:
+            conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+            for category in self.categories:
+                await conn.execute(text(f"""
+                ALTER TABLE {category} ADD COLUMN IF NOT EXISTS search_vector tsvector
+                GENERATED ALWAYS AS (
+                    setweight(to_tsvector('russian', coalesce(title, '')), 'A') ||
+                    setweight(to_tsvector('russian', coalesce(description, '')), 'B') ||
+                    setweight(to_tsvector('russian', coalesce(content, '')), 'C')
+                ) STORED
+                """))
+                await conn.execute(text(
+                    f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {category}_sv_gin ON {category} USING GIN (search_vector)"
+                ))
+    
+    async def _get_many(self, keys: List[str]) -> List[Optional[Any]]:
+        """
+        Получает несколько значений из кэша одним запросом MGET.
+        Для отсутствующих ключей возвращает None.
+        """
+        values = await self.redis.mget(keys)
+        return [orjson.loads(value) if value else None for value in values]
+    
+    async def _set_many(self, entries: List[Tuple[str, Any, List[str]]], ttl: int):
+        """
+        Сохраняет несколько значений в кэш одним pipeline.
+        Каждая запись - (ключ, значение, категории, от которых зависит значение):
+        ключ регистрируется только в множествах этих категорий.
+        """
+        pipe = self.redis.pipeline()
+        keys_by_category: Dict[str, List[str]] = {}
+        for key, value, categories in entries:
+            pipe.set(key, orjson.dumps(value), ex=ttl)
+            for category in categories:
+                keys_by_category.setdefault(category, []).append(key)
+        self._tag_keys(pipe, keys_by_category)
+        await pipe.execute()
+    
+    def _tag_keys(self, pipe, keys_by_category: Dict[str, List[str]]):
+        """
+        Добавляет ключи кэша в множества search_keys:{category}
+        (их очищает RedisCache.invalidate_search_cache при обновлении категории).
+        Время жизни множества продлевается на максимальный TTL кэша поиска,
+        чтобы оно не росло бесконечно и не истекало раньше своих ключей.
+        """
+        for category, keys in keys_by_category.items():
+            tag = search_keys_tag(category)
+            pipe.sadd(tag, *keys)
+            pipe.expire(tag, self.search_cache_ttl)
     
     async def close(self):
         """
         Закрывает соединение с Redis при завершении работы.
         """
         if self.redis:
-            await self.redis.close()
+            await self.redis.aclose()
+            self.redis = None
 
     async def search_all(self, query: str, limit: Optional[int] = None) -> Dict[str, List[Dict[str, Any]]]:
         """
@@ -76,33 +207,46 @@ class SearchEngine:
         # Задаем лимит результатов
         actual_limit = limit if limit is not None else self.max_results
         
-        # Проверяем кэш
-        cache_key = f"search:all:{query.lower()}:{actual_limit}"
-        cached_results = await self.redis.get(cache_key)
-        if cached_results:
-            return json.loads(cached_results)
-        
-        # Выполняем поиск по всем категориям параллельно
-        tasks = []
-        for category in self.categories:
-            tasks.append(self.search_in_category(query, category, actual_limit))
+        # Проверяем кэш: общий ключ и ключи всех категорий одним MGET
+        query_tag = query_cache_tag(query)
+        cache_key = f"search:{query_tag}:all:{actual_limit}"
+        local_results = self._local.get(cache_key)
+        if local_results is not None:
+            return local_results
+        
+        category_keys = [f"search:{query_tag}:{category}:{actual_limit}" for category in self.categories]
+        cached_all, *cached_categories = await self._get_many([cache_key] + category_keys)
+        if cached_all:
+            self._local[cache_key] = cached_all
+            return cached_all
+        
+        # Выполняем поиск параллельно только по категориям, которых нет в кэше.
+        # Запрос нормализуем один раз для всех категорий
+        normalized_query = normalize_text(query)
+        missing = [i for i, cached in enumerate(cached_categories) if cached is None]
+        found = await asyncio.gather(*[
+            self._query_category(normalized_query, self.categories[i], actual_limit) for i in missing
+        ])
+        for i, response in zip(missing, found):
+            cached_categories[i] = response
         
         # Собираем результаты
         results = {}
-        category_results = await asyncio.gather(*tasks)
-        
-        for i, category in enumerate(self.categories):
-            if category_results[i].get("results"):
-                results[category] = category_results[i]["results"]
+        for category, response in zip(self.categories, cached_categories):
+            if response.get("results"):
+                results[category] = response["results"]
         
-        # Кэшируем результаты
-        await self.redis.set(
-            cache_key, 
-            json.dumps({"results": results}), 
-            ex=self.search_cache_ttl
+        # Кэшируем результаты категорий и общий результат одним pipeline
+        response = {"results": results}
+        # Результат категории зависит только от нее, общий результат - от всех категорий
+        await self._set_many(
+            [(category_keys[i], cached_categories[i], [self.categories[i]]) for i in missing]
+            + [(cache_key, response, self.categories)],
+            self.search_cache_ttl
         )
         
-        return {"results": results}
+        self._local[cache_key] = response
+        return response
 
     async def search_in_category(self, query: str, category: str, limit: Optional[int] = None) -> Dict[str, Any]:
         """
@@ -136,34 +280,41 @@ class SearchEngine:
         actual_limit = limit if limit is not None else self.max_results
         
         # Проверяем кэш
-        cache_key = f"search:{category}:{query.lower()}:{actual_limit}"
+        cache_key = f"search:{query_cache_tag(query)}:{category}:{actual_limit}"
+        local_results = self._local.get(cache_key)
+        if local_results is not None:
+            return local_results
+        
         cached_results = await self.redis.get(cache_key)
         if cached_results:
-            return json.loads(cached_results)
+            response = self._local[cache_key] = orjson.loads(cached_results)
+            return response
         
-        # Нормализуем запрос
-        normalized_query = normalize_text(query)
+        response = await self._query_category(normalize_text(query), category, actual_limit)
+        
+        # Кэшируем результаты
+        await self._set_many([(cache_key, response, [category])], self.search_cache_ttl)
         
-        # Создаем SQL-запрос
-        # Используем полнотекстовый поиск PostgreSQL для эффективного поиска
-        sql_query = f"""
-        SELECT id, title, description, content, url, image_url, metadata
-        FROM {category}
-        WHERE 
-            to_tsvector('russian', title || ' ' || coalesce(description, '') || ' ' || coalesce(content, '')) @@ 
-            plainto_tsquery('russian', :query)
-        ORDER BY 
-            ts_rank(to_tsvector('russian', title), plainto_tsquery('russian', :query)) * 2.0 +
-            ts_rank(to_tsvector('russian', coalesce(description, '')), plainto_tsquery('russian', :query)) * 1.5 +
-            ts_rank(to_tsvector('russian', coalesce(content, '')), plainto_tsquery('russian', :query))
-        DESC LIMIT :limit
+        self._local[cache_key] = response
+        return response
+
+    async def _query_category(self, normalized_query: str, category: str, limit: int) -> Dict[str, Any]:
         """
+        Выполняет поисковый запрос к таблице категории без обращения к кэшу.
+        
+        Args:
+            normalized_query: Нормализованный поисковый запрос (см. normalize_text)
+            category: Категория для поиска
+            limit: Максимальное количество результатов
         
+        Returns:
+            Словарь с результатами поиска в указанной категории
+        """
         # Получаем сессию базы данных
         async with get_session() as session:
             result = await session.execute(
-                text(sql_query),
-                {"query": normalized_query, "limit": actual_limit}
+                text(self._search_sql[category]),
+                {"query": normalized_query, "limit": limit}
             )
             rows = result.fetchall()
         
@@ -182,41 +333,42 @@ class SearchEngine:
             # Добавляем метаданные, если они есть
             if row.metadata:
                 if isinstance(row.metadata, str):
-                    metadata = json.loads(row.metadata)
+                    metadata = orjson.loads(row.metadata)
                 else:
                     metadata = row.metadata
                 item.update({"metadata": metadata})
             
             # Добавляем выдержку из контента, если он есть
-            if row.content:
-                # Находим фрагмент, содержащий поисковый запрос
-                content = row.content.lower()
-                query_pos = content.find(query.lower())
-                
-                if query_pos >= 0:
-                    start = max(0, query_pos - 50)
-                    end = min(len(content), query_pos + len(query) + 50)
-                    
-                    # Создаем выдержку
-                    if start > 0:
-                        excerpt = "..." + content[start:end] + "..."
-                    else:
-                        excerpt = content[start:end] + "..."
-                    
-                    item["excerpt"] = excerpt
+            if row.excerpt:
+                item["excerpt"] = row.excerpt
             
             results.append(item)
         
-        # Кэшируем результаты
-        response = {"results": results}
-        await self.redis.set(
-            cache_key, 
-            json.dumps(response), 
-            ex=self.search_cache_ttl
-        )
-        
-        return response
+        return {"results": results}
 
+    async def _get_cached_or_index_suggestions(self, cache_key: str, normalized_query: str,
+                                               limit: int) -> Tuple[Optional[bytes], List[str]]:
+        """
+        Одним pipeline читает кэш предложений и ищет названия, слово которых начинается
+        с запроса, в индексах автодополнения всех категорий (ZRANGEBYLEX).
+        Возвращает (закэшированный ответ, отсортированные названия из индекса).
+        """
+        prefix = normalized_query.encode()
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.get(cache_key)
+        for category in self.categories:
+            pipe.zrangebylex(
+                suggestions_index_key(category), b"[" + prefix, b"[" + prefix + b"\xff", start=0, num=limit
+            )
+        try:
+            cached, *found = await pipe.execute()
+        except Exception as e:
+            logger.error("Ошибка получения предложений из индекса: %s", e)
+            return None, []
+        
+        titles = {member.split(b"\0", 1)[-1].decode() for members in found for member in members}
+        return cached, sorted(titles)[:limit]
+    
     async def get_suggestions(self, query: str, limit: int = 10) -> Dict[str, List[str]]:
         """
         Получает предложения для автодополнения на основе запроса.
@@ -235,60 +387,49 @@ class SearchEngine:
             return {"suggestions": []}
         
         # Проверяем кэш
-        cache_key = f"suggestions:{query.lower()}:{limit}"
-        cached_suggestions = await self.redis.get(cache_key)
-        if cached_suggestions:
-            return json.loads(cached_suggestions)
+        cache_key = f"suggestions:{query_cache_tag(query)}:{limit}"
+        local_suggestions = self._local.get(cache_key)
+        if local_suggestions is not None:
+            return local_suggestions
         
-        # Нормализуем запрос
+        # Нормализуем запрос; из одних знаков препинания префикс не получится
         normalized_query = normalize_text(query)
+        if not normalized_query:
+            return {"suggestions": []}
+        
+        # Кэш и префиксный поиск по индексу названий, который перестраивается при скрапинге
+        cached_suggestions, index_suggestions = await self._get_cached_or_index_suggestions(
+            cache_key, normalized_query, limit
+        )
+        if cached_suggestions:
+            response = self._local[cache_key] = orjson.loads(cached_suggestions)
+            return response
+        if index_suggestions:
+            response = self._local[cache_key] = {"suggestions": index_suggestions}
+            return response
         
-        # Создаем SQL-запрос для получения предложений из всех категорий
         suggestions = set()
         
         # Получаем сессию базы данных
-        async with get_session() as session:
-            for category in self.categories:
-                # Строим SQL-запрос для автодополнения
-                sql_query = f"""
-                SELECT title 
-                FROM {category}
-                WHERE 
-                    to_tsvector('russian', title) @@ 
-                    to_tsquery('russian', :query || ':*')
-                LIMIT :limit
-                """
-                
-                try:
-                    result = await session.execute(
-                        text(sql_query),
-                        {"query": normalized_query, "limit": limit}
-                    )
-                    
-                    for row in result.fetchall():
-                        suggestions.add(row.title)
-                        
-                        # Если достигли лимита, прерываем поиск
-                        if len(suggestions) >= limit:
-                            break
-                            
-                except Exception as e:
-                    logger.error(f"Ошибка при получении предложений из категории {category}: {str(e)}")
-                    continue
-                    
-                # Если достигли лимита, прерываем поиск по категориям
-                if len(suggestions) >= limit:
-                    break
+        try:
+            async with get_session() as session:
+                result = await session.execute(
+                    text(self._suggest_sql),
+                    {"query": normalized_query, "limit": limit}
+                )
+                suggestions = {row.title for row in result.fetchall()}
+        except Exception as e:
+            logger.error("Ошибка при получении предложений: %s", e)
         
         # Преобразуем в список и сортируем
         suggestions_list = sorted(list(suggestions))[:limit]
         
         # Кэшируем результаты на более короткое время
         response = {"suggestions": suggestions_list}
-        await self.redis.set(
-            cache_key, 
-            json.dumps(response), 
-            ex=self.search_cache_ttl // 2  # Используем половину TTL для поиска
+        await self._set_many(
+            [(cache_key, response, self.categories)],
+            self.search_cache_ttl // 2  # Используем половину TTL для поиска
         )
         
+        self._local[cache_key] = response
         return response 
\ No newline at end of file
@@ -0,0 +1,3 @@
+"""
+Модуль фоновых задач (очередь arq)
+"""
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Фоновый воркер скрапинга
+------------------------
+Выполняет скрапинг категорий в отдельном процессе через очередь arq
+- Сохранение результатов в Redis и на диск
+- Постановка задач в очередь из API
+- Повторные попытки с увеличивающейся задержкой
+
+Запуск: python manage.py worker
+"""
+
+import os
+import re
+import asyncio
+import logging
+import orjson
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Tuple
+
+from arq import create_pool, Retry
+from arq.connections import RedisSettings
+
+from src.app.scraper.wiki_scraper import scrape_category, initialize_wiki
+from src.app.redis.redis_cache import redis_cache
+from src.core.config import settings
+
+# Логгер для модуля воркера
+logger = logging.getLogger("wiki_api.worker")
+
+DATA_DIR = settings.TEMP_DIR
+# Количество потоков для параллельной записи файлов элементов на диск
+DISK_WRITE_WORKERS = 16
+# Символы, недопустимые в имени файла элемента (все, кроме букв и цифр)
+UNSAFE_FILENAME_RE = re.compile(r"\W")
+
+# Подключение arq к тому же Redis, что и кэш
+REDIS_SETTINGS = RedisSettings(
+    host=settings.REDIS_HOST,
+    port=settings.REDIS_PORT,
+    unix_socket_path=settings.REDIS_UNIX_SOCKET,
+    database=settings.REDIS_DB,
+    password=settings.REDIS_PASSWORD,
+)
+
+def build_search_corpus(category_data: Dict[str, Dict[str, Any]]) -> List[Tuple[str, str]]:
+    """
+    Подготовка текста для поиска: для каждого элемента название, описание и
+    разделы склеиваются в одну строку в нижнем регистре
+    """
+    corpus = []
+    for title, item_data in category_data.items():
+        parts = [title, item_data.get("description") or ""]
+        for section in item_data.get("sections") or []:
+            parts.append(section.get("title", ""))
+            parts.append(section.get("content", ""))
+        # Разделитель не встречается в запросе, поэтому совпадение не "склеит" соседние поля
+        corpus.append((title, "\x00".join(parts).lower()))
+    return corpus
+
+def scrape_and_store_category(category_name: str) -> bool:
+    """
+    Скрапинг категории с сохранением в Redis и на диск.
+    Возвращает False при ошибке скрапинга или пустом результате
+    """
+    try:
+        # Запускаем скрапинг
+        result = scrape_category(category_name)
+        
+        # Пустой результат - признак сбоя (например, недоступен API Wiki):
+        # не перезаписываем им ни кэш, ни резервную копию на диске
+        if not result:
+            logger.warning(f"Скрапинг категории {category_name} не вернул данных")
+            return False
+        
+        # Сохраняем в Redis категорию и каждый элемент отдельно для быстрого доступа
+        redis_cache.set_items_bulk(result, category=category_name)
+        redis_cache.set_category_index(category_name, list(result.keys()))
+        redis_cache.index_search_documents(category_name, result)
+        redis_cache.set_category_json(category_name, result)
+        redis_cache.set_search_corpus(category_name, build_search_corpus(result))
+        redis_cache.set_suggestions(category_name, list(result.keys()))
+        # Результаты поиска по старым данным больше не актуальны
+        redis_cache.invalidate_search_cache(category_name)
+        
+        logger.info(f"Категория {category_name} успешно загружена в кэш ({len(result)} элементов)")
+            
+        # Также сохраняем на диск как резервную копию
+        try:
+            category_dir = os.path.join(DATA_DIR, category_name)
+            os.makedirs(category_dir, exist_ok=True)
+            
+            # Сохраняем полный файл категории
+            filepath = os.path.join(DATA_DIR, f"{category_name}.json")
+            with open(filepath, 'wb') as f:
+                f.write(orjson.dumps(result, option=orjson.OPT_INDENT_2))
+            
+            def _write_item(entry):
+                title, item_data = entry
+                # Используем безопасное имя файла
+                safe_title = UNSAFE_FILENAME_RE.sub("_", title)
+                item_path = os.path.join(category_dir, f"{safe_title}.json")
+                with open(item_path, 'wb') as f:
+                    f.write(orjson.dumps(item_data, option=orjson.OPT_INDENT_2))
+            
+            # Сохраняем каждый элемент в отдельный файл, записывая файлы параллельно
+            with ThreadPoolExecutor(max_workers=DISK_WRITE_WORKERS) as executor:
+                list(executor.map(_write_item, result.items()))
+            
+            logger.info(f"Категория {category_name} сохранена на диск")
+        except Exception as e:
+            logger.error(f"Ошибка сохранения категории {category_name} на диск: {str(e)}")
+        
+        return True
+    except Exception as e:
+        logger.error(f"Ошибка скрапинга категории {category_name}: {str(e)}")
+        return False
+
+def scrape_and_store_categories(category_names: List[str]) -> None:
+    """Последовательный скрапинг нескольких категорий одной фоновой задачей"""
+    for category_name in category_names:
+        scrape_and_store_category(category_name)
+
+async def startup(ctx: Dict[str, Any]) -> None:
+    """Запуск воркера arq: настройка fandom.py и адреса API Wiki для скрапинга"""
+    await asyncio.to_thread(initialize_wiki)
+
+async def scrape_category_task(ctx: Dict[str, Any], category_name: str) -> None:
+    """Задача arq: скрапинг категории с повтором при ошибке"""
+    # Скрапинг блокирующий, поэтому не занимаем им цикл событий воркера
+    success = await asyncio.to_thread(scrape_and_store_category, category_name)
+    if not success:
+        # Экспоненциальная задержка перед повторной попыткой
+        raise Retry(defer=10 * 2 ** (ctx["job_try"] - 1))
+
+class TaskQueue:
+    """Постановка задач скрапинга в очередь arq"""
+    
+    def __init__(self):
+        """Пул создается при запуске API"""
+        self.pool = None
+    
+    async def initialize(self):
+        """Подключение к очереди задач"""
+        if self.pool or not settings.USE_REDIS_CACHE:
+            return
+        
+        try:
+            self.pool = await create_pool(REDIS_SETTINGS)
+            logger.info("Подключение к очереди задач arq успешно")
+        except Exception as e:
+            logger.error(f"Ошибка подключения к очереди задач arq: {str(e)}")
+            self.pool = None
+    
+    async def close(self):
+        """Закрытие подключения к очереди задач"""
+        if self.pool:
+            await self.pool.aclose()
+            self.pool = None
+    
+    async def enqueue_scrape(self, category_name: str) -> bool:
+        """
+        Постановка скрапинга категории в очередь.
+        Возвращает False, если очередь недоступна.
+        """
+        if not self.pool:
+            return False
+        
+        try:
+            # Фиксированный id не дает поставить в очередь повторный скрапинг той же категории
+            job = await self.pool.enqueue_job(
+                "scrape_category_task", category_name, _job_id=f"scrape:{category_name}"
+            )
+            if job is None:
+                logger.info(f"Скрапинг категории {category_name} уже в очереди")
+            return True
+        except Exception as e:
+            logger.error(f"Ошибка постановки скрапинга категории {category_name} в очередь: {str(e)}")
+            return False
+
+    async def enqueue_scrape_many(self, category_names: List[str]) -> bool:
+        """
+        Постановка скрапинга нескольких категорий в очередь одновременно.
+        Возвращает False, если очередь недоступна.
+        """
+        if not self.pool:
+            return False
+        
+        # Запросы к Redis выполняются параллельно, а не по одному на категорию
+        results = await asyncio.gather(*(self.enqueue_scrape(name) for name in category_names))
+        return all(results)
+
+class WorkerSettings:
+    """Настройки воркера arq"""
+    functions = [scrape_category_task]
+    on_startup = startup
+    redis_settings = REDIS_SETTINGS
+    max_tries = 3
+    # Скрапинг большой категории занимает заметно больше стандартных 5 минут
+    job_timeout = 3600
+    # Результат не храним, чтобы id задачи освобождался сразу после завершения
+    keep_result = 0
+
+# Создаем экземпляр TaskQueue для использования в приложении
+task_queue = TaskQueue()
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Модуль подключения к базе данных
+--------------------------------
+Асинхронный движок SQLAlchemy с пулом соединений и фабрика сессий
+"""
+
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+
+from src.core.config import settings
+
+# Движок создается при первом обращении, чтобы импорт модуля не требовал драйвера БД
+_engine: Optional[AsyncEngine] = None
+_session_factory: Optional[async_sessionmaker] = None
+
+def get_engine() -> AsyncEngine:
+    """
+    Общий движок процесса. Размер пула рассчитан на параллельный поиск
+    по всем категориям (asyncio.gather в SearchEngine.search_all) от нескольких запросов.
+    """
+    global _engine
+    if _engine is None:
+        _engine = create_async_engine(
+            settings.DATABASE_URL,
+            pool_size=max(len(settings.CATEGORIES) * 2, 10),
+            max_overflow=10,
+            pool_pre_ping=True
+        )
+    return _engine
+
+@asynccontextmanager
+async def get_session() -> AsyncIterator[AsyncSession]:
+    """
+    Отдельная сессия со своим соединением из пула на каждый вызов,
+    поэтому параллельные задачи не делят одно соединение.
+    """
+    global _session_factory
+    if _session_factory is None:
+        _session_factory = async_sessionmaker(get_engine(), expire_on_commit=False)
+
+    async with _session_factory() as session:
+        yield session
@@ -14,20 +14,23 @@ import os
 import sys
 import json
 import logging
+import orjson
 from pathlib import Path
 from datetime import datetime
 
+import anyio.to_thread
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import ORJSONResponse
+from fastapi.responses import ORJSONResponse, Response
 from fastapi.openapi.docs import get_swagger_ui_html
 from fastapi.staticfiles import StaticFiles
 
 # Импортируем API роутер
 from src.api.router import api_router
 from src.app.scraper.wiki_scraper import initialize_wiki
-from src.app.redis.redis_cache import redis_cache
-from src.core.config import settings
+from src.app.redis.redis_cache import redis_cache, redis_cache_async
+from src.app.worker.scrape_worker import task_queue
+from src.core.config import settings, ensure_runtime_dirs
 
 # Настройки API
 API_VERSION = os.getenv("API_VERSION", "v1")
@@ -41,6 +44,7 @@ app = FastAPI(
     default_response_class=ORJSONResponse,
     docs_url=None,  # Отключаем стандартный путь к документации
     redoc_url=None,  # Отключаем ReDoc
+    openapi_url="/openapi.json" if DEBUG_MODE else None,  # Схема OpenAPI только в режиме отладки
 )
 
 # Настраиваем CORS для взаимодействия с фронтендом
@@ -89,13 +93,18 @@ async def startup_event():
     """Инициализация при запуске API"""
     logger.info("Запуск API")
     
+    # Создаем рабочие директории (данные, логи, категории)
+    ensure_runtime_dirs()
+    
+    # Увеличиваем пул потоков для синхронных обработчиков и фоновых задач (по умолчанию 40)
+    anyio.to_thread.current_default_thread_limiter().total_tokens = settings.THREADPOOL_SIZE
     
     # Инициализируем wiki_scraper
     try:
         initialize_wiki()
         logger.info("Wiki Scraper инициализирован")
     except Exception as e:
-        logger.error(f"Ошибка инициализации Wiki Scraper: {str(e)}")
+        logger.error("Ошибка инициализации Wiki Scraper: %s", e)
     
     # Проверяем подключение к Redis cache
     if redis_cache.ping():
@@ -103,43 +112,55 @@ async def startup_event():
     else:
         logger.warning("Не удалось подключиться к Redis cache, будет использовано файловое кэширование")
     
+    # Создаем общий пул асинхронных соединений для обработчиков запросов
+    await redis_cache_async.initialize()
+    
+    # Подключаемся к очереди задач скрапинга
+    await task_queue.initialize()
+    
     # Предварительная загрузка категорий в фоновом режиме
     try:
         from src.app.scraper.wiki_scraper import get_all_wiki_categories
         categories = get_all_wiki_categories()
         if categories:
             redis_cache.set_all_categories(categories)
-            logger.info(f"Предварительно загружено {len(categories)} категорий")
+            logger.info("Предварительно загружено %d категорий", len(categories))
     except Exception as e:
-        logger.error(f"Ошибка предварительной загрузки категорий: {str(e)}")
+        logger.error("Ошибка предварительной загрузки категорий: %s", e)
     
     logger.info("API инициализирован и готов к работе")
 
 @app.on_event("shutdown")
 async def shutdown_event():
+    await redis_cache_async.close()
+    await task_queue.close()
     logger.info("API остановлен")
 
+# Ответ корневого маршрута не меняется, поэтому сериализуем его один раз
+ROOT_RESPONSE = orjson.dumps({
+    "name": "Cyberpunk 2077 Wiki API",
+    "version": API_VERSION,
+    "docs_url": "/docs" if DEBUG_MODE else None,
+    "api_url": f"/api/{API_VERSION}"
+})
+
 # Корневой маршрут
 @app.get("/")
 async def root():
     """Корневой эндпоинт с редиректом на документацию"""
-    return {
-        "name": "Cyberpunk 2077 Wiki API",
-        "version": API_VERSION,
-        "docs_url": "/docs",
-        "api_url": f"/api/{API_VERSION}"
-    }
-
-# Кастомные страницы документации
-@app.get("/docs", include_in_schema=False)
-async def custom_swagger_ui_html():
-    """Кастомная страница Swagger UI"""
-    return get_swagger_ui_html(
-        openapi_url="/openapi.json",
-        title="Cyberpunk 2077 Wiki API",
-        swagger_js_url="https://cdn.jsdelivr.net/npm/swagger-ui-dist@5/swagger-ui-bundle.js",
-        swagger_css_url="https://cdn.jsdelivr.net/npm/swagger-ui-dist@5/swagger-ui.css",
-    )
+    return Response(content=ROOT_RESPONSE, media_type="application/json")
+
+# Кастомные страницы документации (только в режиме отладки)
+if DEBUG_MODE:
+    @app.get("/docs", include_in_schema=False)
+    async def custom_swagger_ui_html():
+        """Кастомная страница Swagger UI"""
+        return get_swagger_ui_html(
+            openapi_url="/openapi.json",
+            title="Cyberpunk 2077 Wiki API",
+            swagger_js_url="https://cdn.jsdelivr.net/npm/swagger-ui-dist@5/swagger-ui-bundle.js",
+            swagger_css_url="https://cdn.jsdelivr.net/npm/swagger-ui-dist@5/swagger-ui.css",
+        )
 
 # Запуск приложения (если запускается напрямую, а не через uvicorn)
 if __name__ == "__main__":
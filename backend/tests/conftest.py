@@ -0,0 +1,10 @@
+"""
+Общие настройки тестов: файловый кэш во временной директории и без Redis
+"""
+
+import os
+import tempfile
+
+# Настройки читаются при импорте src.core.config, поэтому задаем их до импорта модулей приложения
+os.environ.setdefault("TEMP_DIR", tempfile.mkdtemp(prefix="wiki_cache_"))
+os.environ.setdefault("USE_REDIS_CACHE", "false")
@@ -0,0 +1,39 @@
+"""
+Тесты файлового кэша RedisCache
+"""
+
+from src.app.redis.redis_cache import RedisCache, MAX_FILE_KEY_LENGTH
+
+
+def make_cache(tmp_path) -> RedisCache:
+    """Кэш без Redis с файлами во временной директории теста"""
+    cache = RedisCache()
+    cache.file_cache_dir = str(tmp_path)
+    return cache
+
+
+def test_file_path_of_long_non_ascii_key_fits_filesystem_limit(tmp_path):
+    cache = make_cache(tmp_path)
+    key = "item:" + "Киберпанк " * 30
+
+    name = cache._get_file_path(key).name
+    # Имя с временным суффиксом .{pid}.tmp тоже не должно превышать 255 байт
+    assert len(name.encode()) <= MAX_FILE_KEY_LENGTH + len(".cache")
+    assert len(name.encode()) - len(".cache") + len(".4194304.tmp") <= 255
+
+
+def test_set_and_get_long_non_ascii_title(tmp_path):
+    cache = make_cache(tmp_path)
+    title = "Джонни Сильверхенд " * 20
+
+    assert cache.set_item_data(title, {"title": title})
+    # Читаем с диска, а не из локального кэша процесса
+    cache._local.clear()
+    assert cache.get_item_data(title) == {"title": title}
+
+
+def test_truncated_keys_with_common_prefix_do_not_collide(tmp_path):
+    cache = make_cache(tmp_path)
+    prefix = "item:" + "Ы" * 150
+
+    assert cache._get_file_path(prefix + "а") != cache._get_file_path(prefix + "б")